@@ -0,0 +1,244 @@
+# ----------------------------------------------------------------------------#
+# Artists.
+# Listing, search, detail, create, edit and delete pages for artists and
+# their JSON API. WTForms is imported in the views that need it.
+# ----------------------------------------------------------------------------#
+import json
+from datetime import datetime
+from flask import Blueprint, current_app, render_template, request, flash, redirect, url_for, abort
+from models import db, Artist, Venue, Show, UpcomingShow
+from schedule import update_scheduled_artist, upcoming_artist_shows_query
+from search import search, filter_genres
+from pagination import keyset_page
+from helpers import (page_cache, facet_cache, map_boolean, default_pic, page_cursors,
+                     selected_genres, genre_match, genre_sidebar, page_cacheable, page_expiry,
+                     artists_page_keys, artist_page_keys, partition_shows, by_start_time,
+                     artist_show_info, delete_entities, bulk_delete, edit_form_data,
+                     submitted_values, changed_values, update_if_unchanged, api_entities)
+
+bp = Blueprint('artists', __name__)
+
+
+@ bp.route('/artists')
+def artists():
+    query = filter_genres(db.session.query(Artist.id, Artist.name), Artist,
+                          selected_genres(), genre_match())
+    page = keyset_page(query, (Artist.id,), current_app.config['PAGE_SIZE'], **page_cursors())
+    return render_template('pages/artists.html', artists=page['rows'], page=page,
+                           genres=genre_sidebar(Artist))
+
+
+@ bp.route('/artists/search', methods=['POST'])
+def search_artists():
+    search_term = request.form.get('search_term', '')
+    artists_search = search(Artist, search_term, current_app.config['SEARCH_RESULTS_LIMIT'],
+                            selected_genres(), genre_match())
+
+    response = {
+        "count": len(artists_search),
+        "data": artists_search
+    }
+    return render_template('pages/search_artists.html', results=response, search_term=request.form.get('search_term', ''))
+
+
+def complete_artist_data(artist):
+    return Artist(
+        id=artist.id,
+        name=artist.name,
+        city=artist.city,
+        state=artist.state,
+        phone=artist.phone,
+        genres=artist.genres,
+        image_link=default_pic(False, artist.image_link),
+        facebook_link=artist.facebook_link,
+        website_link=artist.website_link,
+        seeking_venue=artist.seeking_venue or False,
+        seeking_description=artist.seeking_description
+    )
+
+
+def artist_shows_query():
+    # shows joined to their venue, as listed on an artist page
+    return db.session.query(
+        Show.artist_id,
+        Show.start_time,
+        Venue.id.label('venue_id'),
+        Venue.name.label('venue_name'),
+        Venue.image_link.label('venue_image_link')
+    ).join(Venue, Show.venue_id == Venue.id).order_by(Show.start_time)
+
+
+def artist_shows_union(artist_id, now):
+    # past shows from Show, upcoming ones from the schedule, in one round trip
+    past = artist_shows_query().filter(
+        Show.artist_id == artist_id, Show.start_time <= now)
+    upcoming = upcoming_artist_shows_query().filter(
+        UpcomingShow.artist_id == artist_id, UpcomingShow.start_time > now)
+    return past.order_by(None).union_all(upcoming.order_by(None))
+
+
+def artist_shows(rows, now):
+    return partition_shows(sorted(rows, key=by_start_time), artist_show_info, now)
+
+
+@ bp.route('/artists/<int:artist_id>')
+def show_artist(artist_id):
+    cacheable = page_cacheable()
+    if cacheable:
+        page = page_cache.get(('artist', artist_id))
+        if page is not None:
+            return page
+
+    now = datetime.now()
+    artist_row = db.session.query(*Artist.__table__.columns).filter(
+        Artist.id == artist_id).first()
+    if artist_row is None:
+        abort(404)
+    artist = complete_artist_data(artist_row)
+    shows_list = artist_shows(artist_shows_union(artist_id, now).all(), now)
+    artist_form = {"id": artist.id,
+                   "name": artist.name,
+                   "city": artist.city,
+                   "state": artist.state,
+                   "phone": artist.phone,
+                   "image_link": artist.image_link,
+                   "facebook_link": artist.facebook_link,
+                   "website_link": artist.website_link,
+                   "seeking_venue": artist.seeking_venue or False,
+                   "seeking_description": artist.seeking_description,
+                   "upcoming_shows": shows_list['upcoming_shows'] or [],
+                   "past_shows": shows_list['past_shows'] or [],
+                   "upcoming_shows_count":  shows_list['upcoming_shows_count'],
+                   "past_shows_count": shows_list['past_shows_count']}
+    page = render_template('pages/show_artist.html', artist=artist_form)
+    if cacheable:
+        page_cache.set(('artist', artist_id), page,
+                       page_expiry(shows_list['next_show_time']))
+    return page
+
+
+#  Create Artist
+#  ----------------------------------------------------------------
+@ bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    from forms import ArtistForm
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+
+@ bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    # called upon submitting the new artist listing form
+    # TODO: insert form data as a new Venue record in the db, instead
+    message = ''
+    from forms import ArtistForm
+    form = ArtistForm(request.form, meta={'csrf': False})
+    try:
+        artist = Artist(
+            name=form.name.data,
+            city=form.city.data,
+            state=form.state.data,
+            phone=form.phone.data,
+            genres=form.genres.data,
+            image_link=default_pic(False, form.image_link.data),
+            facebook_link=form.facebook_link.data,
+            website_link=form.website_link.data,
+            seeking_venue=map_boolean(form.seeking_venue.data),
+            seeking_description=form.seeking_description.data)
+        # upcoming_shows=[],
+        # past_shows_count=0,
+        # upcoming_shows_count=0)
+        db.session.add(artist)
+        db.session.commit()
+        facet_cache.clear()
+        message = f'Artist {form.name.data} was successfully listed!'
+    except ():
+        db.session.rollback()
+        message = f'An error occurred. Artist could not be listed.'
+    finally:
+        db.session.close()
+    flash(message)
+    return render_template('pages/home.html')
+
+
+#  Delete Artist
+#  ----------------------------------------------------------------
+@ bp.route('/artists/<int:artist_id>/delete', methods=['POST'])
+def delete_artist(artist_id):
+    message = ''
+    try:
+        deleted = delete_entities(Artist, [artist_id], artists_page_keys)
+        if deleted:
+            message = f'Artist {deleted[0].name} has been deleted.'
+        else:
+            message = f'Artist {artist_id} does not exist.'
+    except Exception as e:
+        db.session.rollback()
+        message = f'An error occurred. Artist {artist_id} could not be deleted.'
+    finally:
+        db.session.close()
+
+    flash(message)
+    return render_template('pages/home.html')
+
+
+@ bp.route('/artists/delete', methods=['POST'])
+def delete_artists():
+    return bulk_delete(Artist, artists_page_keys)
+
+
+#  Update Artist
+#  ----------------------------------------------------------------
+ARTIST_EDIT_FIELDS = ['name', 'genres', 'city', 'state', 'phone', 'website_link',
+                      'facebook_link', 'seeking_venue', 'seeking_description', 'image_link']
+
+
+@ bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+    artist = edit_form_data(Artist, artist_id, ARTIST_EDIT_FIELDS)
+    from forms import ArtistForm
+    form = ArtistForm(data=artist, meta={'csrf': False})
+    original = json.dumps({field: artist[field] for field in ARTIST_EDIT_FIELDS})
+    return render_template('forms/edit_artist.html', form=form, artist=artist, original=original)
+
+
+@ bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    message = ''
+    from forms import ArtistForm
+    form = ArtistForm(request.form, meta={'csrf': False})
+    submitted = submitted_values(form, ARTIST_EDIT_FIELDS, False)
+    changes = changed_values(submitted, False)
+    try:
+        if not changes:
+            message = f'Artist {form.name.data} was not changed.'
+        elif not update_if_unchanged(Artist, artist_id, changes):
+            db.session.rollback()
+            message = f'Artist {artist_id} was changed by someone else in the meantime. Please review it and edit again.'
+        else:
+            stale_pages = [('artist', artist_id)]
+            if 'name' in changes or 'image_link' in changes:
+                update_scheduled_artist(artist_id, submitted['name'], submitted['image_link'])
+                stale_pages = artist_page_keys(artist_id)
+            db.session.commit()
+            page_cache.invalidate(*stale_pages)
+            if 'genres' in changes:
+                facet_cache.clear()
+            message = f'Artist {form.name.data} was successfully updated!'
+    except Exception as e:
+        db.session.rollback()
+        message = f'An error occurred. Artist {artist_id} could not be updated.'
+    finally:
+        db.session.close()
+
+    flash(message)
+
+    return redirect(url_for('artists.show_artist', artist_id=artist_id))
+
+
+#  API
+#  ----------------------------------------------------------------
+@ bp.route('/api/artists')
+def api_artists():
+    return api_entities(Artist, upcoming_artist_shows_query(), UpcomingShow.artist_id,
+                        artist_show_info)
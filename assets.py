@@ -0,0 +1,208 @@
+# ----------------------------------------------------------------------------#
+# Static assets.
+# `flask assets build` minifies and bundles the CSS/JS in BUNDLES, copies
+# every file under static/ to static/dist/ with a content hash in its name,
+# writes .gz/.br variants of the text files and records the mapping in
+# static/dist/manifest.json.
+# At runtime url_for('static', filename=...) resolves through the manifest,
+# so templates keep using their source names, and hashed files are served
+# precompressed with far-future immutable caching. Without a build, the
+# source files are served as before.
+# ----------------------------------------------------------------------------#
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+from importlib import import_module
+import click
+from flask import current_app, request, url_for, send_from_directory
+from flask.cli import with_appcontext
+from werkzeug.security import safe_join
+
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+COMPRESSIBLE = {'.css', '.js', '.map', '.svg', '.json', '.txt', '.eot', '.ttf', '.otf'}
+
+# bundle name -> source files, in load order
+BUNDLES = {
+    'styles.css': ['css/bootstrap.min.css',
+                   'css/layout.main.css',
+                   'css/main.css',
+                   'css/main.responsive.css',
+                   'css/main.quickfix.css'],
+    'head.js': ['js/libs/modernizr-2.8.2.min.js',
+                'js/libs/moment.min.js'],
+    # run after the jQuery <script> at the end of the page
+    'deferred.js': ['js/script.js',
+                    'js/libs/bootstrap-3.1.1.min.js',
+                    'js/plugins.js'],
+}
+
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def optional(module):
+    # the build-only packages, so serving never imports them
+    try:
+        return import_module(module)
+    except ImportError:
+        return None
+
+
+def minify(name, text):
+    extension = os.path.splitext(name)[1]
+    rcssmin, rjsmin = optional('rcssmin'), optional('rjsmin')
+    if extension == '.css':
+        if rcssmin is not None:
+            return rcssmin.cssmin(text)
+        # comments and whitespace only; rcssmin does a proper job
+        text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+        text = re.sub(r'\s+', ' ', text)
+        return re.sub(r'\s*([{};,])\s*', r'\1', text).strip()
+    if extension == '.js' and rjsmin is not None and not name.endswith('.min.js'):
+        return rjsmin.jsmin(text)
+    return text
+
+
+def rewrite_css_urls(name, text, manifest, static_url_path):
+    # url()s are relative to the source file; point them at the hashed
+    # copies, or at the original location when there is none
+    def replace(match):
+        target = match.group(2)
+        if re.match(r'^([a-z]+:|/|#)', target):
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', target).groups()
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(name), path))
+        return f'url("{static_url_path}/{manifest.get(path, path)}{suffix}")'
+    return CSS_URL.sub(replace, text)
+
+
+def hashed_name(name, data):
+    stem, extension = os.path.splitext(name)
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return f'{DIST}/{stem}.{digest}{extension}'
+
+
+def write_asset(static_folder, name, data):
+    path = os.path.join(static_folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(data)
+    if os.path.splitext(name)[1] not in COMPRESSIBLE:
+        return
+    variants = [('.gz', gzip.compress(data, 9, mtime=0))]
+    brotli = optional('brotli')
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    for suffix, compressed in variants:
+        if len(compressed) < len(data):
+            with open(path + suffix, 'wb') as file:
+                file.write(compressed)
+
+
+def source_files(static_folder):
+    for directory, subdirectories, files in os.walk(static_folder):
+        relative = os.path.relpath(directory, static_folder).replace(os.sep, '/')
+        if relative == DIST or relative.startswith(DIST + '/'):
+            subdirectories[:] = []
+            continue
+        for file in sorted(files):
+            yield file if relative == '.' else f'{relative}/{file}'
+
+
+def build_assets(static_folder, static_url_path):
+    shutil.rmtree(os.path.join(static_folder, DIST), ignore_errors=True)
+    manifest = {}
+    sources = sorted(source_files(static_folder))
+    # stylesheets last, so their url()s can point at hashed fonts/images
+    sources.sort(key=lambda name: name.endswith('.css'))
+    for name in sources:
+        with open(os.path.join(static_folder, name), 'rb') as file:
+            data = file.read()
+        if name.endswith(('.css', '.js')):
+            text = minify(name, data.decode('utf-8'))
+            if name.endswith('.css'):
+                text = rewrite_css_urls(name, text, manifest, static_url_path)
+            data = text.encode('utf-8')
+        manifest[name] = hashed_name(name, data)
+        write_asset(static_folder, manifest[name], data)
+
+    for bundle, names in BUNDLES.items():
+        parts = []
+        for name in names:
+            with open(os.path.join(static_folder, name), encoding='utf-8') as file:
+                text = minify(name, file.read())
+            if name.endswith('.css'):
+                text = rewrite_css_urls(name, text, manifest, static_url_path)
+            parts.append(text)
+        # ; keeps concatenated scripts from running into each other
+        data = ('\n' if bundle.endswith('.css') else ';\n').join(parts).encode('utf-8')
+        manifest[bundle] = hashed_name(bundle, data)
+        write_asset(static_folder, manifest[bundle], data)
+
+    with open(os.path.join(static_folder, DIST, MANIFEST), 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, DIST, MANIFEST)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_assets(app):
+    manifest = load_manifest(app.static_folder)
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = manifest.get(values['filename'], values['filename'])
+
+    def asset_urls(bundle):
+        # the built bundle, or its source files when there is no build
+        if bundle in manifest:
+            return [url_for('static', filename=bundle)]
+        return [url_for('static', filename=name) for name in BUNDLES[bundle]]
+
+    def serve_static(filename):
+        if not filename.startswith(DIST + '/'):
+            return app.send_static_file(filename)
+        # send_file hands the open file to wsgi.file_wrapper (sendfile
+        # under gunicorn), or to the proxy with USE_X_SENDFILE
+        response = None
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            variant = safe_join(app.static_folder, filename + suffix)
+            if request.accept_encodings[encoding] and variant and os.path.isfile(variant):
+                response = send_from_directory(app.static_folder, filename + suffix,
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                response.headers['Content-Encoding'] = encoding
+                break
+        if response is None:
+            response = send_from_directory(app.static_folder, filename)
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.vary.add('Accept-Encoding')
+        return response
+
+    app.jinja_env.globals['asset_urls'] = asset_urls
+    app.view_functions['static'] = serve_static
+
+
+@click.group('assets')
+def assets_cli():
+    """Build the fingerprinted static assets."""
+
+
+@assets_cli.command('build')
+@with_appcontext
+def build_command():
+    """Bundle, minify, hash and precompress everything under static/."""
+    manifest = build_assets(current_app.static_folder, current_app.static_url_path)
+    click.echo(f'Wrote {len(manifest)} assets to {os.path.join(current_app.static_folder, DIST)}.')
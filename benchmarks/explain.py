@@ -0,0 +1,111 @@
+# ----------------------------------------------------------------------------#
+# Query plan check.
+# Seeds a scratch database, records every SELECT the read routes issue and
+# runs EXPLAIN on it. Exits non-zero if any of them plans a sequential scan
+# of Venue, Artist or Show, so an index regression fails CI.
+#
+# The database at BENCHMARK_DATABASE_URL is DROPPED and recreated (see
+# testing.py), so never point it at real data.
+# Usage: BENCHMARK_DATABASE_URL=postgresql://... python benchmarks/explain.py
+# ----------------------------------------------------------------------------#
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from testing import use_scratch_database, rebuild_schema  # noqa: E402
+
+TABLES = {'Venue', 'Artist', 'Show'}
+# statements that read every row by design and are not EXPLAINed: the genre
+# facet counts (search.genre_facets) unnest the genres of the whole table.
+# They are cached per process until the next venue/artist write.
+EXEMPT = ('unnest(',)
+
+
+def seq_scans(plan):
+    found = []
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in TABLES:
+        found.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def run(url, shows):
+    from sqlalchemy import event, text
+    from sqlalchemy.engine import Engine
+    from app import create_app
+    from models import db, Venue, Artist
+    from seed import seed_database
+    from routes import routes
+
+    app = create_app(commands=True, overrides={'TESTING': True})
+    page_cache = app.extensions['page_cache']
+    rebuild_schema(app, url)
+    with app.app_context():
+        seed_database(venues=max(shows // 20, 1), artists=max(shows // 10, 1),
+                      shows=shows, seed=shows)
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        venue_id = db.session.query(Venue.id).first()[0]
+        artist_id = db.session.query(Artist.id).first()[0]
+        db.session.remove()
+    page_cache.clear()
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'set_config' not in statement:
+            captured.append((statement, parameters))
+
+    client = app.test_client()
+    failures = 0
+    for label, method, path, data in routes(venue_id, artist_id):
+        if method == 'POST' and not path.endswith('/search'):
+            continue
+        captured.clear()
+        event.listen(Engine, 'before_cursor_execute', capture)
+        try:
+            client.open(path, method=method, data=data)
+        finally:
+            event.remove(Engine, 'before_cursor_execute', capture)
+
+        route_failures = 0
+        exempt = 0
+        with app.app_context():
+            cursor = db.engine.raw_connection().cursor()
+            for statement, parameters in captured:
+                if any(marker in statement for marker in EXEMPT):
+                    exempt += 1
+                    continue
+                cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                scanned = seq_scans(plan[0]['Plan'])
+                if scanned:
+                    route_failures += 1
+                    print(f'FAIL {label}: seq scan on {", ".join(scanned)}\n'
+                          f'     {" ".join(statement.split())}')
+            cursor.connection.close()
+        if not route_failures:
+            print(f'ok   {label}: {len(captured) - exempt} queries checked'
+                  + (f', {exempt} exempt' if exempt else ''))
+        failures += route_failures
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shows', type=int, default=50000,
+                        help='shows to seed; small tables are always seq scanned '
+                             '(default: %(default)s)')
+    args = parser.parse_args()
+
+    url = use_scratch_database('BENCHMARK_DATABASE_URL')
+    if not url:
+        sys.exit('Set BENCHMARK_DATABASE_URL to a scratch database; it will be wiped.')
+
+    sys.exit(1 if run(url, args.shows) else 0)
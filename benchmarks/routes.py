@@ -0,0 +1,121 @@
+# ----------------------------------------------------------------------------#
+# Route benchmark.
+# Seeds a scratch database at several scales and drives every route through
+# the Flask test client, reporting p50/p95/p99 latency, queries per request
+# and peak memory per route.
+#
+# The database at BENCHMARK_DATABASE_URL is DROPPED and recreated for every
+# scale (see testing.py), so never point it at real data.
+# Usage: BENCHMARK_DATABASE_URL=postgresql://... python benchmarks/routes.py
+# ----------------------------------------------------------------------------#
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from testing import use_scratch_database, rebuild_schema  # noqa: E402
+
+DEFAULT_SCALES = '100,1000,10000'
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def show_slot(iteration):
+    # a new slot every request; reusing one would only measure the
+    # double-booking rejection after the first request
+    start_time = datetime(2030, 1, 1, 20) + timedelta(hours=3 * iteration)
+    return start_time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def routes(venue_id, artist_id):
+    # (label, method, path, form data or a function of the iteration)
+    return [
+        ('home', 'GET', '/', None),
+        ('venues', 'GET', '/venues', None),
+        ('venue detail', 'GET', f'/venues/{venue_id}', None),
+        ('venue search', 'POST', '/venues/search', {'search_term': 'blue'}),
+        ('venue form', 'GET', '/venues/create', None),
+        ('venue edit form', 'GET', f'/venues/{venue_id}/edit', None),
+        ('artists', 'GET', '/artists', None),
+        ('artist detail', 'GET', f'/artists/{artist_id}', None),
+        ('artist search', 'POST', '/artists/search', {'search_term': 'blue'}),
+        ('artist form', 'GET', '/artists/create', None),
+        ('artist edit form', 'GET', f'/artists/{artist_id}/edit', None),
+        ('shows', 'GET', '/shows', None),
+        ('show form', 'GET', '/shows/create', None),
+        ('create show', 'POST', '/shows/create',
+         lambda iteration: {'venue_id': venue_id, 'artist_id': artist_id,
+                            'start_time': show_slot(iteration)}),
+    ]
+
+
+def measure(client, method, path, data, requests):
+    timings = []
+    queries = []
+    tracemalloc.start()
+    for iteration in range(requests):
+        form = data(iteration) if callable(data) else data
+        start = time.perf_counter()
+        response = client.open(path, method=method, data=form)
+        timings.append(time.perf_counter() - start)
+        queries.append(int(response.headers.get('X-DB-Query-Count', 0)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"p50": percentile(timings, 0.50) * 1000,
+            "p95": percentile(timings, 0.95) * 1000,
+            "p99": percentile(timings, 0.99) * 1000,
+            "queries": sum(queries) / len(queries),
+            "peak_kb": peak / 1024}
+
+
+def run(url, scales, requests):
+    from app import create_app
+    from models import db, Venue, Artist
+    from seed import seed_database
+
+    app = create_app(commands=True, overrides={'TESTING': True})
+    page_cache = app.extensions['page_cache']
+    client = app.test_client()
+    print(f'{"shows":>8} {"route":<18} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+          f'{"queries":>8} {"peak KB":>9}')
+    for shows in scales:
+        # from the migrations, so the indexes are there
+        rebuild_schema(app, url)
+        with app.app_context():
+            seed_database(venues=max(shows // 20, 1), artists=max(shows // 10, 1),
+                          shows=shows, seed=shows)
+            venue_id = db.session.query(Venue.id).first()[0]
+            artist_id = db.session.query(Artist.id).first()[0]
+            db.session.remove()
+        page_cache.clear()
+
+        for label, method, path, data in routes(venue_id, artist_id):
+            result = measure(client, method, path, data, requests)
+            print(f'{shows:>8} {label:<18} {result["p50"]:>8.2f} {result["p95"]:>8.2f} '
+                  f'{result["p99"]:>8.2f} {result["queries"]:>8.1f} {result["peak_kb"]:>9.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', default=DEFAULT_SCALES,
+                        help='comma separated show counts (default: %(default)s)')
+    parser.add_argument('--requests', type=int, default=50,
+                        help='requests per route and scale (default: %(default)s)')
+    args = parser.parse_args()
+
+    url = use_scratch_database('BENCHMARK_DATABASE_URL')
+    if not url:
+        sys.exit('Set BENCHMARK_DATABASE_URL to a scratch database; it will be wiped.')
+    # must be in place before config.py is imported by app
+    os.environ['SQL_INSTRUMENTATION'] = '1'
+    os.environ.setdefault('SQL_REPEAT_THRESHOLD', '1000000')
+
+    run(url, [int(scale) for scale in args.scales.split(',')], args.requests)
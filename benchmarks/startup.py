@@ -0,0 +1,90 @@
+# ----------------------------------------------------------------------------#
+# Startup benchmark.
+# Cold-starts the app in fresh interpreters, the way a new worker does, and
+# reports the median time to import app.py, to run create_app() and to serve
+# the first request (GET / through the test client), plus how many modules
+# are loaded by then. --importtime lists the slowest modules app.py imports.
+# The home page needs no database, so no DATABASE_URL is required.
+# Usage: python benchmarks/startup.py [--runs 20] [--importtime]
+# ----------------------------------------------------------------------------#
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+COLD_START = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+response = application.test_client().get('/')
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({"import": imported - start,
+                  "create_app": created - imported,
+                  "first_response": served - created,
+                  "total": served - start,
+                  "modules": len(sys.modules)}))
+'''
+
+
+def environment():
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'startup-benchmark')
+    # as under gunicorn/uvicorn, not the flask command
+    env.pop('FLASK_RUN_FROM_CLI', None)
+    return env
+
+
+def cold_start():
+    output = subprocess.run([sys.executable, '-c', COLD_START], cwd=ROOT, env=environment(),
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_times(limit):
+    # -X importtime lines: "import time: self [us] | cumulative | package"
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=ROOT, env=environment(), check=True,
+                            capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    # nesting is two spaces per level; app.py itself sits at one
+    direct = [row for row in rows if row[2].startswith('   ') and row[2][3] != ' ']
+    return sorted(direct, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--importtime', action='store_true',
+                        help='list the slowest imports made by app.py')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    results = [cold_start() for _ in range(args.runs)]
+    print(f'{args.runs} cold starts, median (min - max)')
+    for key in ('import', 'create_app', 'first_response', 'total'):
+        samples = [result[key] * 1000 for result in results]
+        print(f'{key:>16}  {statistics.median(samples):8.1f} ms'
+              f'  ({min(samples):.1f} - {max(samples):.1f})')
+    print(f'{"modules":>16}  {statistics.median(r["modules"] for r in results):8.0f}')
+
+    if args.importtime:
+        print(f'\n{"cumulative":>12} {"self":>10}  import')
+        for cumulative_us, self_us, name in import_times(args.top):
+            print(f'{cumulative_us / 1000:9.1f} ms {self_us / 1000:7.1f} ms  {name.strip()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# ----------------------------------------------------------------------------#
+# Compares the old /venues city grouping with group_venues_by_area.
+# Usage: python benchmarks/venues_grouping.py [number_of_venues]
+# ----------------------------------------------------------------------------#
+import os
+import random
+import sys
+import timeit
+from collections import namedtuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from venues import group_venues_by_area  # noqa: E402
+
+VenueRow = namedtuple('VenueRow', ['id', 'name', 'city', 'state'])
+
+
+# the old grouping: collect the distinct city/state pairs, then scan every
+# venue again for each of them
+def get_city_info(venue):
+    return {"city": venue.city, "state": venue.state}
+
+
+def get_venues_by_location(city_info, venues):
+    venues_by_location = []
+    for venue in venues:
+        if venue.city == city_info['city'] and venue.state == city_info['state']:
+            venues_by_location.append(venue)
+    return venues_by_location
+
+
+def old_grouping(venues):
+    city_info_with_duplicates = list(map(get_city_info, venues))
+    cities = []
+    for city_info in city_info_with_duplicates:
+        if city_info not in cities:
+            cities.append(city_info)
+    return [{"city": city['city'],
+             "state": city['state'],
+             "venues": get_venues_by_location(city, venues)} for city in cities]
+
+
+def make_rows(count, cities=500):
+    rows = [VenueRow(i, f'Venue {i}', f'City {random.randrange(cities)}', 'CA')
+            for i in range(count)]
+    # same ordering as VENUES_SORT_KEY
+    rows.sort(key=lambda row: (row.state, row.city, row.id))
+    return rows
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rows = make_rows(count)
+    old = timeit.timeit(lambda: old_grouping(rows), number=3) / 3
+    new = timeit.timeit(lambda: group_venues_by_area(rows), number=3) / 3
+    print(f'{count} venues')
+    print(f'old grouping: {old * 1000:.1f} ms')
+    print(f'new grouping: {new * 1000:.1f} ms')
@@ -0,0 +1,71 @@
+# ----------------------------------------------------------------------------#
+# Page cache.
+# In-process LRU cache for rendered pages. Every entry has its own expiry,
+# so a page can be dropped as soon as the data it shows would change on its
+# own (e.g. an upcoming show moving into the past).
+# Every process has its own cache and writes only invalidate the cache of the
+# process that handled them. With several workers the others keep serving
+# their copy until it expires, so the ttl is how stale a page may get.
+# ----------------------------------------------------------------------------#
+import threading
+import time
+from collections import OrderedDict
+
+
+class PageCache:
+    def __init__(self, max_entries=512, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, page = entry
+            if expires_at <= time.time():
+                del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def set(self, key, page, expires_at=None):
+        # expires_at (epoch seconds) can only shorten the configured ttl
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self.lock:
+            self.entries[key] = (deadline, page)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in keys:
+                if self.entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries),
+                    "max_entries": self.max_entries,
+                    "ttl": self.ttl,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "invalidations": self.invalidations}
@@ -0,0 +1,138 @@
+# ----------------------------------------------------------------------------#
+# Response compression.
+# Compresses HTML, JSON, CSV and NDJSON responses with brotli (when the
+# brotli package is installed) or gzip, whichever the client prefers.
+# Buffered bodies under COMPRESSION_MIN_SIZE are left alone; streamed ones
+# are compressed chunk by chunk as they are produced, with a sync flush every
+# STREAM_FLUSH_BYTES so clients keep receiving data. Bytes in/out and CPU
+# time are counted per process, see /compression/stats.
+# ----------------------------------------------------------------------------#
+import threading
+import time
+import zlib
+from importlib.util import find_spec
+from flask import request
+
+COMPRESSIBLE_TYPES = {'text/html', 'text/plain', 'text/css', 'text/csv',
+                      'application/json', 'application/x-ndjson',
+                      'application/javascript', 'image/svg+xml'}
+STREAM_FLUSH_BYTES = 16 * 1024
+
+
+class CompressionStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_time = 0.0
+
+    def add(self, bytes_in, bytes_out, cpu_time):
+        with self.lock:
+            self.responses += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_time += cpu_time
+
+    def stats(self):
+        with self.lock:
+            return {"responses": self.responses,
+                    "bytes_in": self.bytes_in,
+                    "bytes_out": self.bytes_out,
+                    "bytes_saved": self.bytes_in - self.bytes_out,
+                    "ratio": self.bytes_out / self.bytes_in if self.bytes_in else None,
+                    "cpu_ms": round(self.cpu_time * 1000, 2)}
+
+
+def compressor(encoding, level):
+    # (compress, flush, finish) for one response
+    if encoding == 'br':
+        import brotli
+        engine = brotli.Compressor(quality=level)
+        return engine.process, engine.flush, engine.finish
+    # wbits=31: gzip container
+    engine = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return engine.compress, lambda: engine.flush(zlib.Z_SYNC_FLUSH), engine.flush
+
+
+def compress_stream(chunks, encoding, level, stats):
+    compress, flush, finish = compressor(encoding, level)
+    bytes_in = bytes_out = 0
+    cpu_time = 0.0
+    pending = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            start = time.thread_time()
+            output = compress(chunk)
+            pending += len(chunk)
+            if pending >= STREAM_FLUSH_BYTES:
+                output += flush()
+                pending = 0
+            cpu_time += time.thread_time() - start
+            bytes_in += len(chunk)
+            if output:
+                bytes_out += len(output)
+                yield output
+        start = time.thread_time()
+        output = finish()
+        cpu_time += time.thread_time() - start
+        bytes_out += len(output)
+        yield output
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+        stats.add(bytes_in, bytes_out, cpu_time)
+
+
+def compressible(response):
+    return (response.status_code == 200
+            and not response.direct_passthrough
+            and 'Content-Encoding' not in response.headers
+            and response.mimetype in COMPRESSIBLE_TYPES
+            and 'no-transform' not in response.headers.get('Cache-Control', ''))
+
+
+def init_compression(app):
+    stats = CompressionStats()
+    if not app.config['COMPRESSION']:
+        return stats
+
+    # only looks brotli up; it is imported by the first br response
+    encodings = ['br', 'gzip'] if find_spec('brotli') else ['gzip']
+    levels = {"br": app.config['COMPRESSION_BROTLI_LEVEL'],
+              "gzip": app.config['COMPRESSION_GZIP_LEVEL']}
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+
+    @app.after_request
+    def compress_response(response):
+        if not compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding,
+                                                levels[encoding], stats)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            compress, flush, finish = compressor(encoding, levels[encoding])
+            start = time.thread_time()
+            compressed = compress(data) + finish()
+            cpu_time = time.thread_time() - start
+            if len(compressed) >= len(data):
+                stats.add(len(data), len(data), cpu_time)
+                return response
+            stats.add(len(data), len(compressed), cpu_time)
+            response.set_data(compressed)
+            response.headers.add('Server-Timing', f'compress;dur={cpu_time * 1000:.2f}')
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return stats
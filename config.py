@@ -1,13 +1,99 @@
 import os
-SECRET_KEY = os.urandom(32)
+import tempfile
+# Shared by every worker; create_app refuses to start without it unless TESTING
+SECRET_KEY = os.environ.get('SECRET_KEY')
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
-# Enable debug mode.
-DEBUG = True
+# Enable debug mode with FLASK_ENV=development or FLASK_DEBUG=1; off by default.
+DEBUG = (os.environ.get('FLASK_DEBUG', '0') == '1'
+         or os.environ.get('FLASK_ENV') == 'development')
 
 # Connect to the database
 
 
 # TODO IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = 'postgresql://postgres@localhost:5432/fyyurdb'
+SQLALCHEMY_DATABASE_URI = os.environ.get(
+    'DATABASE_URL', 'postgresql://postgres@localhost:5432/fyyurdb')
+
+# Connection pool (see database.py)
+DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 5))
+DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW', 10))
+DATABASE_POOL_TIMEOUT = int(os.environ.get('DATABASE_POOL_TIMEOUT', 10))
+DATABASE_POOL_RECYCLE = int(os.environ.get('DATABASE_POOL_RECYCLE', 1800))
+DATABASE_POOL_PRE_PING = os.environ.get('DATABASE_POOL_PRE_PING', '1') == '1'
+# Set when running behind a transaction-mode pooler such as PgBouncer
+DATABASE_POOL_DISABLED = os.environ.get('DATABASE_POOL_DISABLED', '0') == '1'
+
+# statement_timeout for read pages and for writes, in milliseconds
+READ_STATEMENT_TIMEOUT_MS = int(os.environ.get('READ_STATEMENT_TIMEOUT_MS', 5000))
+WRITE_STATEMENT_TIMEOUT_MS = int(os.environ.get('WRITE_STATEMENT_TIMEOUT_MS', 15000))
+
+
+# Maximum number of results returned by the venue and artist searches
+SEARCH_RESULTS_LIMIT = int(os.environ.get('SEARCH_RESULTS_LIMIT', 50))
+
+# Rendered venue/artist detail pages kept in memory per process. Edits only
+# invalidate the worker that made them, so with several workers the TTL bounds
+# how long the others serve a stale page.
+PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 512))
+PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL', 300))
+
+# Rows per page on the /venues, /artists and /shows listings
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+
+# Per-request SQL statement counts/timings (see instrumentation.py)
+SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', '0') == '1'
+# Flag a request when one statement runs more than this many times
+SQL_REPEAT_THRESHOLD = int(os.environ.get('SQL_REPEAT_THRESHOLD', 5))
+
+# Most ids accepted by one /api/<venues|artists|shows>?ids= batch fetch
+API_MAX_IDS = int(os.environ.get('API_MAX_IDS', 100))
+
+# Genre facet counts, kept until the next venue/artist write in this process;
+# other workers pick the change up after FACET_CACHE_TTL
+FACET_CACHE_SIZE = int(os.environ.get('FACET_CACHE_SIZE', 256))
+FACET_CACHE_TTL = int(os.environ.get('FACET_CACHE_TTL', 600))
+
+# Length of a show when none is given; shows may not overlap at a venue or
+# for an artist
+DEFAULT_SHOW_MINUTES = int(os.environ.get('DEFAULT_SHOW_MINUTES', 120))
+
+# Compiled templates, shared by every worker on the host. By default they go
+# to Jinja's private per-user directory under the system temp dir; a
+# directory given here must be owned by this user and not writable by others.
+JINJA_BYTECODE_CACHE = os.environ.get('JINJA_BYTECODE_CACHE', '1') == '1'
+JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR')
+# Rendered tile/list fragments keyed by their rows, see template_cache.py
+FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 1024))
+FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL', 3600))
+
+# Let the front proxy send static files (X-Sendfile) instead of the app
+USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', '0') == '1'
+
+# Response compression (see compression.py); brotli needs the brotli package
+COMPRESSION = os.environ.get('COMPRESSION', '1') == '1'
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_LEVEL = int(os.environ.get('COMPRESSION_BROTLI_LEVEL', 5))
+
+# Tile thumbnails and uploaded images (see images.py); thumbnails need Pillow
+IMAGE_FETCHER = os.environ.get('IMAGE_FETCHER', 'http')  # 'http' or 'local'
+IMAGE_LOCAL_DIR = os.environ.get('IMAGE_LOCAL_DIR', os.path.join(basedir, 'static', 'img'))
+IMAGE_UPLOAD_DIR = os.environ.get('IMAGE_UPLOAD_DIR', os.path.join(basedir, 'uploads'))
+IMAGE_CACHE_DIR = os.environ.get(
+    'IMAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'fyyur-thumbnails'))
+IMAGE_UPLOAD_MAX_BYTES = int(os.environ.get('IMAGE_UPLOAD_MAX_BYTES', 1024 * 1024 * 1024))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+IMAGE_FETCH_TIMEOUT = int(os.environ.get('IMAGE_FETCH_TIMEOUT', 10))
+IMAGE_FETCH_MAX_REDIRECTS = int(os.environ.get('IMAGE_FETCH_MAX_REDIRECTS', 3))
+# Comma-separated hosts (and their subdomains) originals may come from;
+# empty allows any host. Private and loopback addresses are always refused.
+IMAGE_FETCH_HOSTS = [host.strip().lower() for host in
+                     os.environ.get('IMAGE_FETCH_HOSTS', '').split(',') if host.strip()]
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+# How long an original that could not be thumbnailed is left alone
+IMAGE_FAILURE_TTL = int(os.environ.get('IMAGE_FAILURE_TTL', 3600))
+IMAGE_FAILURE_CACHE_SIZE = int(os.environ.get('IMAGE_FAILURE_CACHE_SIZE', 4096))
+THUMBNAIL_MAX_AGE = int(os.environ.get('THUMBNAIL_MAX_AGE', 86400))
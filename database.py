@@ -0,0 +1,75 @@
+# ----------------------------------------------------------------------------#
+# Database engine setup.
+# Builds the SQLAlchemy engine options from config, applies a per-request
+# statement_timeout and reports how long requests waited for a pooled
+# connection.
+# ----------------------------------------------------------------------------#
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event, text
+from sqlalchemy.pool import NullPool, QueuePool
+from models import db
+
+# POST endpoints that only read, and so get the read timeout
+READ_ONLY_POST_ENDPOINTS = {'venues.search_venues', 'artists.search_artists'}
+
+
+class TimedQueuePool(QueuePool):
+    # QueuePool that records how long each checkout waited on the pool
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if has_request_context():
+                g.pool_wait = g.get('pool_wait', 0.0) + time.perf_counter() - start
+
+
+def engine_options(config):
+    if config['DATABASE_POOL_DISABLED']:
+        # a transaction-mode pooler (e.g. PgBouncer) already pools connections
+        return {"poolclass": NullPool,
+                "pool_pre_ping": config['DATABASE_POOL_PRE_PING']}
+    return {"poolclass": TimedQueuePool,
+            "pool_size": config['DATABASE_POOL_SIZE'],
+            "max_overflow": config['DATABASE_MAX_OVERFLOW'],
+            "pool_timeout": config['DATABASE_POOL_TIMEOUT'],
+            "pool_recycle": config['DATABASE_POOL_RECYCLE'],
+            "pool_pre_ping": config['DATABASE_POOL_PRE_PING']}
+
+
+def is_read_request():
+    return request.method in ('GET', 'HEAD') or request.endpoint in READ_ONLY_POST_ENDPOINTS
+
+
+def statement_timeout(app):
+    if not has_request_context():
+        return None
+    if is_read_request():
+        return app.config['READ_STATEMENT_TIMEOUT_MS']
+    return app.config['WRITE_STATEMENT_TIMEOUT_MS']
+
+
+def init_database(app):
+    # after db.init_app(app); creates this app's engine with the options
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    # on this app's engine only, so further apps (tests, benchmarks) do not
+    # stack up listeners on every engine in the process
+    @event.listens_for(db.get_engine(app), 'begin')
+    def set_statement_timeout(conn):
+        timeout = statement_timeout(app)
+        if timeout and conn.dialect.name == 'postgresql':
+            # SET LOCAL semantics: scoped to this transaction, which keeps it
+            # safe behind a transaction-mode pooler
+            conn.execute(text("SELECT set_config('statement_timeout', :timeout, true)"),
+                         {"timeout": str(timeout)})
+
+    @app.after_request
+    def report_pool_wait(response):
+        if 'pool_wait' in g:
+            response.headers.add(
+                'Server-Timing', f'db-pool;dur={g.pool_wait * 1000:.2f}')
+        return response
@@ -0,0 +1,101 @@
+# ----------------------------------------------------------------------------#
+# Export.
+# Streams shows (joined with their venue and artist names), venues or artists
+# as CSV or NDJSON. Rows come off a server-side cursor and are written out as
+# they arrive, so memory stays flat and the first line goes out right away.
+# Usage: flask export shows --format csv --from 2024-01-01 --state CA -o shows.csv
+# ----------------------------------------------------------------------------#
+import csv
+import io
+import json
+import click
+from flask.cli import with_appcontext
+from models import db, Venue, Artist, Show
+
+YIELD_PER = 1000
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def shows_query():
+    return db.session.query(
+        Show.id,
+        Show.start_time,
+        Show.end_time,
+        Venue.id.label('venue_id'),
+        Venue.name.label('venue_name'),
+        Venue.city.label('venue_city'),
+        Venue.state.label('venue_state'),
+        Artist.id.label('artist_id'),
+        Artist.name.label('artist_name')
+    ).join(Venue, Show.venue_id == Venue.id
+           ).join(Artist, Show.artist_id == Artist.id
+                  ).order_by(Show.start_time, Show.id)
+
+
+def entities_query(model):
+    return db.session.query(*model.__table__.columns).order_by(model.id)
+
+
+def export_query(kind, start=None, end=None, city=None, state=None):
+    if kind == 'shows':
+        query = shows_query()
+        # city/state filter on where the show takes place
+        located, timed = Venue, Show
+    else:
+        model = Venue if kind == 'venues' else Artist
+        query = entities_query(model)
+        located, timed = model, None
+
+    if city:
+        query = query.filter(located.city.ilike(city))
+    if state:
+        query = query.filter(located.state.ilike(state))
+    if timed is not None and start:
+        query = query.filter(timed.start_time >= start)
+    if timed is not None and end:
+        query = query.filter(timed.start_time < end)
+    return query.execution_options(stream_results=True).yield_per(YIELD_PER)
+
+
+def parse_date(value):
+    if not value:
+        return None
+    import dateutil.parser
+    return dateutil.parser.parse(value)
+
+
+def export_lines(query, format):
+    columns = [column['name'] for column in query.column_descriptions]
+    if format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in query:
+            writer.writerow([';'.join(value) if isinstance(value, list) else value
+                             for value in row])
+            # flush whatever the writer produced for this row
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for row in query:
+            yield json.dumps(dict(zip(columns, row)), default=str) + '\n'
+
+
+@click.command('export')
+@click.argument('kind', type=click.Choice(['shows', 'venues', 'artists']))
+@click.option('--format', 'format', type=click.Choice(sorted(FORMATS)), default='csv',
+              show_default=True)
+@click.option('--from', 'start', help='Only shows starting at or after this date.')
+@click.option('--to', 'end', help='Only shows starting before this date.')
+@click.option('--city')
+@click.option('--state')
+@click.option('-o', '--output', type=click.File('w'), default='-',
+              help='Output file, stdout by default.')
+@with_appcontext
+def export_command(kind, format, start, end, city, state, output):
+    """Export shows, venues or artists as CSV or NDJSON."""
+    query = export_query(kind, parse_date(start), parse_date(end), city, state)
+    for line in export_lines(query, format):
+        output.write(line)
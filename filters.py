@@ -0,0 +1,42 @@
+# ----------------------------------------------------------------------------#
+# Filters.
+# babel and dateutil are imported the first time a date is formatted rather
+# than when a worker starts.
+# ----------------------------------------------------------------------------#
+import functools
+from datetime import datetime
+
+
+@functools.lru_cache(maxsize=1)
+def datetime_locale():
+    import babel
+    return babel.Locale.parse('en')
+
+
+@functools.lru_cache(maxsize=64)
+def datetime_pattern(format):
+    import babel.dates
+    return babel.dates.parse_pattern(format)
+
+
+@functools.lru_cache(maxsize=4096)
+def format_native_datetime(date, format):
+    import babel.dates
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    elif format in ('long', 'short'):
+        # locale-defined formats, not patterns
+        return babel.dates.format_datetime(date, format, locale=datetime_locale())
+    # babel.dates.format_datetime reads naive datetimes as UTC
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=babel.dates.UTC)
+    return datetime_pattern(format).apply(date, datetime_locale())
+
+
+def format_datetime(value, format='medium'):
+    if not isinstance(value, datetime):
+        import dateutil.parser
+        value = dateutil.parser.parse(value)
+    return format_native_datetime(value, format)
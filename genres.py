@@ -0,0 +1,23 @@
+# Genres venues and artists can pick from. Kept apart from forms.py so the
+# search and import code can use them without loading WTForms.
+GENRES = [
+    'Alternative',
+    'Blues',
+    'Classical',
+    'Country',
+    'Electronic',
+    'Folk',
+    'Funk',
+    'Hip-Hop',
+    'Heavy Metal',
+    'Instrumental',
+    'Jazz',
+    'Musical Theatre',
+    'Pop',
+    'Punk',
+    'R&B',
+    'Reggae',
+    'Rock n Roll',
+    'Soul',
+    'Other',
+]
@@ -0,0 +1,319 @@
+# ----------------------------------------------------------------------------#
+# View helpers.
+# Shared by the venue, artist, show and main blueprints. The caches and
+# services live in app.extensions, set up by create_app in app.py.
+# ----------------------------------------------------------------------------#
+import json
+from datetime import datetime
+from flask import current_app, request, session, abort, url_for, Response
+from werkzeug.local import LocalProxy
+from models import db, Show, UpcomingShow
+from genres import GENRES
+from search import genre_facets
+from pagination import keyset_page
+from serialization import to_json
+
+page_cache = LocalProxy(lambda: current_app.extensions['page_cache'])
+facet_cache = LocalProxy(lambda: current_app.extensions['facet_cache'])
+
+
+def map_boolean(boolean_to_map):
+    if boolean_to_map == 'y' or boolean_to_map == True:
+        return True
+    return False
+
+
+def default_pic(venue, original_pic):
+    if original_pic != '':
+        return original_pic
+    if venue == True:
+        return 'https://images.unsplash.com/photo-1549213783-8284d0336c4f?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=300&q=80'
+    return 'https://images.unsplash.com/photo-1543900694-133f37abaaa5?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=400&q=60'
+
+
+def page_cursors():
+    return {"after": request.args.get('after'),
+            "before": request.args.get('before')}
+
+
+def listing_url(**changes):
+    # the current listing URL with its filters kept and its cursor replaced
+    args = request.args.to_dict(flat=False)
+    args.pop('after', None)
+    args.pop('before', None)
+    args.update(changes)
+    return url_for(request.endpoint, **args)
+
+
+#  Genre facets
+#  ----------------------------------------------------------------
+def selected_genres():
+    return [genre for genre in request.values.getlist('genre') if genre in GENRES]
+
+
+def genre_match():
+    return 'all' if request.values.get('match') == 'all' else 'any'
+
+
+def cached_genre_facets(model, genres, match):
+    # counts only change on venue/artist writes, which clear facet_cache
+    key = (model.__tablename__, tuple(sorted(genres)), match)
+    facets = facet_cache.get(key)
+    if facets is None:
+        facets = genre_facets(model, genres, match)
+        facet_cache.set(key, facets)
+    return facets
+
+
+def genre_sidebar(model):
+    genres = selected_genres()
+    match = genre_match()
+    return {"facets": cached_genre_facets(model, genres, match),
+            "selected": genres,
+            "match": match}
+
+
+#  Page cache
+#  ----------------------------------------------------------------
+def page_cacheable():
+    # pages with pending flash messages render them once, so never cache them
+    return '_flashes' not in session
+
+
+def page_expiry(next_show_time):
+    # a detail page changes by itself when its next show starts
+    if next_show_time is None:
+        return None
+    return next_show_time.timestamp()
+
+
+def venues_page_keys(venue_ids):
+    artist_ids = db.session.query(Show.artist_id).filter(
+        Show.venue_id.in_(venue_ids)).distinct()
+    return ([('venue', venue_id) for venue_id in venue_ids]
+            + [('artist', artist_id) for (artist_id,) in artist_ids])
+
+
+def artists_page_keys(artist_ids):
+    venue_ids = db.session.query(Show.venue_id).filter(
+        Show.artist_id.in_(artist_ids)).distinct()
+    return ([('artist', artist_id) for artist_id in artist_ids]
+            + [('venue', venue_id) for (venue_id,) in venue_ids])
+
+
+def venue_page_keys(venue_id):
+    return venues_page_keys([venue_id])
+
+
+def artist_page_keys(artist_id):
+    return artists_page_keys([artist_id])
+
+
+#  Detail pages
+#  ----------------------------------------------------------------
+def partition_shows(rows, show_info, now=None):
+    # split past/upcoming against a single timestamp, counting as we go.
+    # rows come ordered by start_time, so the first upcoming one is the next
+    # show and the moment this split changes.
+    now = now or datetime.now()
+    past_shows = []
+    upcoming_shows = []
+    next_show_time = None
+    for row in rows:
+        if row.start_time is None:
+            continue
+        if row.start_time > now:
+            if next_show_time is None:
+                next_show_time = row.start_time
+            upcoming_shows.append(show_info(row))
+        else:
+            past_shows.append(show_info(row))
+
+    return {"past_shows": past_shows,
+            "upcoming_shows": upcoming_shows,
+            "past_shows_count": len(past_shows),
+            "upcoming_shows_count": len(upcoming_shows),
+            "next_show_time": next_show_time
+            }
+
+
+def by_start_time(row):
+    return row.start_time
+
+
+def venue_show_info(row):
+    return {"artist_id": row.artist_id,
+            "artist_name": row.artist_name,
+            "artist_image_link": default_pic(False, row.artist_image_link),
+            "start_time": row.start_time}
+
+
+def artist_show_info(row):
+    return {"venue_id": row.venue_id,
+            "venue_name": row.venue_name,
+            "venue_image_link": default_pic(True, row.venue_image_link),
+            "start_time": row.start_time}
+
+
+#  Delete
+#  ----------------------------------------------------------------
+def delete_entities(model, ids, page_keys):
+    # one DELETE for every id; the database cascades to their shows and
+    # schedule rows, so nothing is loaded into the session.
+    # Returns the (id, name) of the deleted rows.
+    stale_pages = page_keys(ids)
+    deleted = db.session.execute(model.__table__.delete().where(
+        model.id.in_(ids)).returning(model.id, model.name)).fetchall()
+    db.session.commit()
+    page_cache.invalidate(*stale_pages)
+    facet_cache.clear()
+    return deleted
+
+
+def bulk_delete_ids():
+    # ids=1,2,3 or repeated ids=1&ids=2, from the form or the query string
+    try:
+        ids = {int(id) for value in request.values.getlist('ids')
+               for id in value.split(',') if id.strip()}
+    except ValueError:
+        abort(api_response({"error": "ids must be integers"}, 400))
+    if not ids:
+        abort(api_response({"error": "no ids given"}, 400))
+    if len(ids) > current_app.config['API_MAX_IDS']:
+        abort(api_response({"error": f"at most {current_app.config['API_MAX_IDS']} ids per request"}, 400))
+    return sorted(ids)
+
+
+def bulk_delete(model, page_keys):
+    ids = bulk_delete_ids()
+    try:
+        deleted = delete_entities(model, ids, page_keys)
+    except Exception as e:
+        db.session.rollback()
+        return api_response({"error": "the delete failed, nothing was deleted"}, 500)
+    finally:
+        db.session.close()
+    return api_response({"deleted": [id for id, name in deleted],
+                         "count": len(deleted)})
+
+
+#  Update
+#  ----------------------------------------------------------------
+def edit_form_data(model, entity_id, fields):
+    # the editable columns plus id/version, in one query
+    row = db.session.query(model.id, model.version, *[getattr(model, field) for field in fields]
+                           ).filter(model.id == entity_id).first()
+    if row is None:
+        abort(404)
+    return row._asdict()
+
+
+def form_value(field, value, venue):
+    # a column value as the edit form saves it
+    if field == 'image_link':
+        return default_pic(venue, value or '')
+    if field in ('seeking_talent', 'seeking_venue'):
+        return map_boolean(value)
+    if field == 'genres':
+        return list(value or [])
+    return value
+
+
+def submitted_values(form, fields, venue):
+    return {field: form_value(field, getattr(form, field).data, venue) for field in fields}
+
+
+def changed_values(submitted, venue):
+    # compare against the values the form was rendered with, saved the same
+    # way, so e.g. a missing image that the form fills in is not a change
+    try:
+        original = json.loads(request.form.get('original') or '{}')
+    except ValueError:
+        original = {}
+    if not isinstance(original, dict):
+        original = {}
+    original = {field: form_value(field, value, venue) for field, value in original.items()}
+    # an empty input for a NULL column is not a change
+    return {field: value for field, value in submitted.items()
+            if field not in original
+            or original[field] != value and not (original[field] is None and value == '')}
+
+
+def update_if_unchanged(model, entity_id, changes):
+    # single UPDATE ... WHERE id = :id AND version = :version; no rows
+    # updated means someone else saved the row since the form was rendered
+    try:
+        version = int(request.form.get('version', ''))
+    except ValueError:
+        return False
+    changes = dict(changes, version=model.version + 1)
+    updated = model.query.filter(model.id == entity_id, model.version == version).update(
+        changes, synchronize_session=False)
+    return updated == 1
+
+
+#  API
+#  ----------------------------------------------------------------
+def api_response(data, status=200):
+    return Response(to_json(data), status=status, mimetype='application/json')
+
+
+def api_ids():
+    ids = request.args.get('ids')
+    if not ids:
+        return None
+    try:
+        ids = [int(id) for id in ids.split(',') if id]
+    except ValueError:
+        abort(api_response({"error": "ids must be a comma separated list of integers"}, 400))
+    if len(ids) > current_app.config['API_MAX_IDS']:
+        abort(api_response({"error": f"at most {current_app.config['API_MAX_IDS']} ids per request"}, 400))
+    return ids
+
+
+def api_columns(available):
+    # sparse fieldsets: only the requested columns are selected, id always is
+    fields = request.args.get('fields')
+    if not fields:
+        return list(available.values())
+    names = [name for name in fields.split(',') if name]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        abort(api_response({"error": f"unknown fields: {', '.join(unknown)}"}, 400))
+    return [available['id']] + [available[name] for name in names if name != 'id']
+
+
+def api_embeds():
+    return set(filter(None, request.args.get('embed', '').split(',')))
+
+
+def api_fetch(query, id_column):
+    ids = api_ids()
+    if ids is not None:
+        rows = query.filter(id_column.in_(ids)).order_by(id_column).all()
+        return [row._asdict() for row in rows], {}
+    page = keyset_page(query, (id_column,), current_app.config['PAGE_SIZE'], **page_cursors())
+    return ([row._asdict() for row in page['rows']],
+            {"next_cursor": page['next_cursor'], "prev_cursor": page['prev_cursor']})
+
+
+def embed_upcoming_shows(items, shows_query, owner_column, show_info):
+    # one query for the upcoming shows of every item in the batch
+    ids = [item['id'] for item in items]
+    upcoming = {id: [] for id in ids}
+    if ids:
+        rows = shows_query.filter(owner_column.in_(ids),
+                                  UpcomingShow.start_time > datetime.now())
+        for row in rows:
+            upcoming[getattr(row, owner_column.key)].append(show_info(row))
+    for item in items:
+        item['upcoming_shows'] = upcoming[item['id']]
+        item['upcoming_shows_count'] = len(item['upcoming_shows'])
+
+
+def api_entities(model, shows_query, owner_column, show_info):
+    columns = {column.key: getattr(model, column.key) for column in model.__table__.columns}
+    data, page = api_fetch(db.session.query(*api_columns(columns)), model.id)
+    if 'upcoming_shows' in api_embeds():
+        embed_upcoming_shows(data, shows_query, owner_column, show_info)
+    return api_response({"data": data, **page})
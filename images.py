@@ -0,0 +1,305 @@
+# ----------------------------------------------------------------------------#
+# Images.
+# Tiles show fixed-size JPEG thumbnails instead of the full-size originals
+# that image_link points at. The |thumbnail filter turns an image URL into
+# /thumbnails/<size>/<signature>.jpg; the first request for one schedules it on a
+# background thread pool and redirects to the original, later ones are served
+# from a size-bounded on-disk LRU cache. Originals come from a pluggable
+# fetcher (IMAGE_FETCHER): 'http' downloads them from public addresses only
+# (optionally only from IMAGE_FETCH_HOSTS), 'local' reads files of the same
+# name from IMAGE_LOCAL_DIR as an offline stand-in. Uploaded images are
+# stored in IMAGE_UPLOAD_DIR, up to IMAGE_UPLOAD_MAX_BYTES in total, and
+# served from /images/<name>. Originals that could not be thumbnailed are
+# not tried again for IMAGE_FAILURE_TTL seconds; their tiles keep
+# redirecting to the original meanwhile.
+# Thumbnailing needs Pillow; without it the filter leaves URLs unchanged.
+# ----------------------------------------------------------------------------#
+import hashlib
+import hmac
+import http.client
+import io
+import ipaddress
+import logging
+import os
+import posixpath
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+from flask import url_for
+from cache import PageCache
+
+# bounding boxes; .tile img is at most 200px high, so 2x for dense screens
+THUMBNAIL_SIZES = {'tile': (400, 400)}
+UPLOAD_TYPES = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    # files in one directory, evicted least recently used first once they
+    # add up to more than max_bytes. Each process keeps its own index, so
+    # with several workers the bound is approximate.
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith('.tmp'):
+                continue
+            stat = os.stat(os.path.join(directory, name))
+            entries.append((stat.st_mtime, name, stat.st_size))
+        self.sizes = OrderedDict((name, size) for mtime, name, size in sorted(entries))
+        self.total = sum(self.sizes.values())
+
+    def get(self, name):
+        path = os.path.join(self.directory, name)
+        with self.lock:
+            try:
+                # mtime doubles as the last-used time for the next startup
+                os.utime(path)
+            except OSError:
+                self.total -= self.sizes.pop(name, 0)
+                self.misses += 1
+                return None
+            if name in self.sizes:
+                self.sizes.move_to_end(name)
+            self.hits += 1
+            return path
+
+    def set(self, name, data):
+        path = os.path.join(self.directory, name)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+        with self.lock:
+            self.total += len(data) - self.sizes.pop(name, 0)
+            self.sizes[name] = len(data)
+            while self.total > self.max_bytes and len(self.sizes) > 1:
+                oldest, size = self.sizes.popitem(last=False)
+                self.total -= size
+                self.evictions += 1
+                try:
+                    os.remove(os.path.join(self.directory, oldest))
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.sizes),
+                    "bytes": self.total,
+                    "max_bytes": self.max_bytes,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions}
+
+
+def check_peer(sock):
+    # checked on the connected socket rather than on a lookup made
+    # beforehand, so a name that resolves differently the second time
+    # cannot point the fetch at an internal service
+    address = ipaddress.ip_address(sock.getpeername()[0].split('%')[0])
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    if not address.is_global or address.is_multicast:
+        sock.close()
+        raise ValueError(f'refusing to fetch images from {address}')
+
+
+class PublicHTTPConnection(http.client.HTTPConnection):
+    def connect(self):
+        super().connect()
+        check_peer(self.sock)
+
+
+class PublicHTTPSConnection(http.client.HTTPSConnection, PublicHTTPConnection):
+    # HTTPSConnection.connect calls PublicHTTPConnection.connect, so the
+    # peer is checked before the TLS handshake
+    pass
+
+
+class PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(PublicHTTPConnection, req)
+
+
+class PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(PublicHTTPSConnection, req, context=self._context)
+
+
+def check_image_url(src, hosts):
+    url = urllib.parse.urlparse(src)
+    if url.scheme not in ('http', 'https') or not url.hostname:
+        raise ValueError(f'not an http(s) image URL: {src}')
+    host = url.hostname.lower()
+    if hosts and not any(host == allowed or host.endswith('.' + allowed) for allowed in hosts):
+        raise ValueError(f'images are not fetched from {host}')
+
+
+def http_fetcher(config):
+    max_bytes = config['IMAGE_MAX_BYTES']
+    timeout = config['IMAGE_FETCH_TIMEOUT']
+    hosts = config['IMAGE_FETCH_HOSTS']
+
+    class RedirectHandler(urllib.request.HTTPRedirectHandler):
+        max_redirections = config['IMAGE_FETCH_MAX_REDIRECTS']
+
+        def redirect_request(self, req, fp, code, msg, headers, newurl):
+            check_image_url(newurl, hosts)
+            return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+    # no ProxyHandler: through a proxy the peer check would only see the proxy
+    opener = urllib.request.OpenerDirector()
+    for handler in (PublicHTTPHandler(), PublicHTTPSHandler(), RedirectHandler(),
+                    urllib.request.HTTPDefaultErrorHandler(),
+                    urllib.request.HTTPErrorProcessor()):
+        opener.add_handler(handler)
+
+    def fetch(src):
+        check_image_url(src, hosts)
+        with opener.open(src, timeout=timeout) as response:
+            length = response.headers.get('Content-Length')
+            if length and length.isdigit() and int(length) > max_bytes:
+                raise ValueError(f'image larger than {max_bytes} bytes: {src}')
+            data = response.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise ValueError(f'image larger than {max_bytes} bytes: {src}')
+        return data
+    return fetch
+
+
+def local_fetcher(config):
+    directory = config['IMAGE_LOCAL_DIR']
+
+    def fetch(src):
+        name = posixpath.basename(urllib.parse.urlparse(src).path)
+        with open(os.path.join(directory, name), 'rb') as file:
+            return file.read()
+    return fetch
+
+
+FETCHERS = {'http': http_fetcher, 'local': local_fetcher}
+
+
+def make_thumbnail(data, box):
+    from PIL import Image
+    image = Image.open(io.BytesIO(data))
+    # lets JPEG decode straight at a reduced scale
+    image.draft('RGB', box)
+    image = image.convert('RGB')
+    image.thumbnail(box)
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=80, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+class Images:
+    def __init__(self, app):
+        config = app.config
+        # Pillow itself is imported by the first thumbnail or upload
+        self.enabled = find_spec('PIL') is not None
+        secret = config['SECRET_KEY']
+        self.secret = secret if isinstance(secret, bytes) else secret.encode()
+        self.upload_dir = config['IMAGE_UPLOAD_DIR']
+        self.upload_max_bytes = config['IMAGE_UPLOAD_MAX_BYTES']
+        self.max_bytes = config['IMAGE_MAX_BYTES']
+        self.fetcher = FETCHERS[config['IMAGE_FETCHER']](config)
+        self.cache = DiskCache(config['IMAGE_CACHE_DIR'], config['IMAGE_CACHE_MAX_BYTES'])
+        self.executor = ThreadPoolExecutor(config['IMAGE_WORKERS'],
+                                           thread_name_prefix='thumbnails')
+        self.pending = set()
+        self.failures = PageCache(config['IMAGE_FAILURE_CACHE_SIZE'], config['IMAGE_FAILURE_TTL'])
+        self.lock = threading.Lock()
+        os.makedirs(self.upload_dir, exist_ok=True)
+        app.jinja_env.filters['thumbnail'] = self.thumbnail_url
+
+    def signature(self, src):
+        # so /thumbnails only ever fetches URLs the app rendered
+        return hmac.new(self.secret, src.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def valid_signature(self, signature, src):
+        return hmac.compare_digest(signature, self.signature(src))
+
+    def thumbnail_url(self, src, size='tile'):
+        if not src or not self.enabled:
+            return src
+        return url_for('main.thumbnail', size=size, signature=self.signature(src), src=src)
+
+    def cache_name(self, src, size):
+        return f'{hashlib.sha256(src.encode()).hexdigest()[:32]}-{size}.jpg'
+
+    def cached_thumbnail(self, src, size):
+        return self.cache.get(self.cache_name(src, size))
+
+    def schedule(self, src, size):
+        name = self.cache_name(src, size)
+        if self.failures.get(name) is not None:
+            return
+        with self.lock:
+            if name in self.pending:
+                return
+            self.pending.add(name)
+        self.executor.submit(self.generate, name, size, src, self.loader(src))
+
+    def loader(self, src):
+        # resolved in the request, the workers have no app context. Our own
+        # uploads are read from disk, everything else goes to the fetcher.
+        prefix = url_for('main.uploaded_image', name='-').rsplit('/', 1)[0] + '/'
+        if src.startswith(prefix):
+            name = src[len(prefix):]
+            return lambda: self.read_upload(name)
+        return lambda: self.fetcher(src)
+
+    def generate(self, name, size, src, load):
+        try:
+            self.cache.set(name, make_thumbnail(load(), THUMBNAIL_SIZES[size]))
+        except Exception:
+            logger.warning('Could not make a %s thumbnail of %s', size, src, exc_info=True)
+            self.failures.set(name, True)
+        finally:
+            with self.lock:
+                self.pending.discard(name)
+
+    def read_upload(self, name):
+        with open(os.path.join(self.upload_dir, os.path.basename(name)), 'rb') as file:
+            return file.read()
+
+    def store_upload(self, stream):
+        # returns the stored file name; raises ValueError for anything that
+        # is not a reasonably sized image
+        data = stream.read(self.max_bytes + 1)
+        if len(data) > self.max_bytes:
+            raise ValueError(f'images are limited to {self.max_bytes} bytes')
+        if not self.enabled:
+            raise ValueError('image uploads need Pillow installed')
+        from PIL import Image
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.verify()
+        except Exception:
+            raise ValueError('not an image')
+        if image.format not in UPLOAD_TYPES:
+            raise ValueError(f'unsupported image type {image.format}')
+        name = hashlib.sha256(data).hexdigest()[:32] + UPLOAD_TYPES[image.format]
+        path = os.path.join(self.upload_dir, name)
+        with self.lock:
+            if os.path.exists(path):
+                return name
+            # summed on every upload, so the bound holds across workers
+            stored = sum(entry.stat().st_size for entry in os.scandir(self.upload_dir)
+                         if entry.is_file())
+            if stored + len(data) > self.upload_max_bytes:
+                raise ValueError('image storage is full')
+            with open(path, 'wb') as file:
+                file.write(data)
+        return name
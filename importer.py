@@ -0,0 +1,278 @@
+# ----------------------------------------------------------------------------#
+# Bulk import.
+# Streams CSV or JSON Lines files into the Venue, Artist and Show tables in
+# fixed-size batches, so memory stays flat whatever the file size. Batches go
+# through COPY on PostgreSQL and executemany everywhere else.
+# Usage: flask import shows shows.csv --rejects rejected.jsonl
+# ----------------------------------------------------------------------------#
+import csv
+import io
+import json
+import time
+import click
+import dateutil.parser
+from datetime import timedelta
+from flask import current_app
+from flask.cli import with_appcontext
+from models import db, Venue, Artist, Show
+from genres import GENRES
+from schedule import roll_forward_schedule
+
+BATCH_SIZE = 5000
+TRUE_VALUES = {'1', 'true', 't', 'y', 'yes', 'on'}
+
+VENUE_FIELDS = ['name', 'city', 'state', 'address', 'phone', 'image_link',
+                'facebook_link', 'website_link', 'genres', 'seeking_talent',
+                'seeking_description']
+ARTIST_FIELDS = ['name', 'city', 'state', 'phone', 'image_link', 'facebook_link',
+                 'website_link', 'genres', 'seeking_venue', 'seeking_description']
+SHOW_FIELDS = ['start_time', 'end_time', 'venue_id', 'artist_id']
+
+
+def read_records(stream, format):
+    # JSON Lines come out unparsed, so a malformed line is rejected on its
+    # own by parse_record instead of ending the import
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def parse_record(record):
+    if not isinstance(record, str):
+        return record
+    record = json.loads(record)
+    if not isinstance(record, dict):
+        raise ValueError('not a JSON object')
+    return record
+
+
+def text(record, field):
+    value = record.get(field)
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def boolean(record, field):
+    value = record.get(field)
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+def genres(record):
+    value = record.get('genres') or []
+    if isinstance(value, str):
+        value = [genre.strip() for genre in value.split(';') if genre.strip()]
+    unknown = [genre for genre in value if genre not in GENRES]
+    if unknown:
+        raise ValueError(f'unknown genres: {", ".join(unknown)}')
+    return value
+
+
+def check_lengths(model, row):
+    # one over-long value would fail the whole COPY, so reject just its row
+    for field, value in row.items():
+        length = getattr(model.__table__.c[field].type, 'length', None)
+        if isinstance(value, str) and length and len(value) > length:
+            raise ValueError(f'{field} is longer than {length} characters')
+
+
+def clean_venue(record):
+    row = {field: text(record, field) for field in VENUE_FIELDS}
+    for field in ('name', 'city', 'state'):
+        if not row[field]:
+            raise ValueError(f'{field} is required')
+    check_lengths(Venue, row)
+    row['genres'] = genres(record)
+    row['seeking_talent'] = boolean(record, 'seeking_talent')
+    return row
+
+
+def clean_artist(record):
+    row = {field: text(record, field) for field in ARTIST_FIELDS}
+    if not row['name']:
+        raise ValueError('name is required')
+    check_lengths(Artist, row)
+    row['genres'] = genres(record)
+    row['seeking_venue'] = boolean(record, 'seeking_venue')
+    return row
+
+
+def clean_show(record):
+    start_time = text(record, 'start_time')
+    if not start_time:
+        raise ValueError('start_time is required')
+    start_time = dateutil.parser.parse(start_time)
+    end_time = text(record, 'end_time')
+    if end_time:
+        end_time = dateutil.parser.parse(end_time)
+    else:
+        minutes = int(text(record, 'duration') or current_app.config['DEFAULT_SHOW_MINUTES'])
+        end_time = start_time + timedelta(minutes=minutes)
+    if end_time <= start_time:
+        raise ValueError('end_time must be after start_time')
+    row = {"start_time": start_time,
+           "end_time": end_time,
+           "venue_id": text(record, 'venue_id'),
+           "artist_id": text(record, 'artist_id'),
+           # shows can name their venue/artist instead of giving ids
+           "venue_name": text(record, 'venue_name'),
+           "artist_name": text(record, 'artist_name')}
+    for entity in ('venue', 'artist'):
+        if row[f'{entity}_id'] is not None:
+            row[f'{entity}_id'] = int(row[f'{entity}_id'])
+        elif row[f'{entity}_name'] is None:
+            raise ValueError(f'{entity}_id or {entity}_name is required')
+    return row
+
+
+def resolve_references(model, entity, rows, reject):
+    # one IN lookup per batch for ids, and one for names
+    id_field, name_field = f'{entity}_id', f'{entity}_name'
+    ids = {row[id_field] for row in rows if row[id_field] is not None}
+    names = {row[name_field] for row in rows if row[id_field] is None}
+    known_ids = set()
+    if ids:
+        known_ids = {id for (id,) in db.session.query(model.id).filter(model.id.in_(ids))}
+    ids_by_name = {}
+    if names:
+        # lowest id wins when several rows share a name
+        for id, name in db.session.query(model.id, model.name).filter(
+                model.name.in_(names)).order_by(model.id.desc()):
+            ids_by_name[name] = id
+
+    resolved = []
+    for row in rows:
+        if row[id_field] is None:
+            row[id_field] = ids_by_name.get(row[name_field])
+            if row[id_field] is None:
+                reject(row, f'no {entity} named {row[name_field]!r}')
+                continue
+        elif row[id_field] not in known_ids:
+            reject(row, f'no {entity} with id {row[id_field]}')
+            continue
+        resolved.append(row)
+    return resolved
+
+
+def resolve_shows(rows, reject):
+    rows = resolve_references(Venue, 'venue', rows, reject)
+    rows = resolve_references(Artist, 'artist', rows, reject)
+    return [{field: row[field] for field in SHOW_FIELDS} for row in rows]
+
+
+def copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, list):
+        items = (item.replace('\\', '\\\\').replace('"', '\\"') for item in value)
+        return '{' + ','.join(f'"{item}"' for item in items) + '}'
+    return value
+
+
+def copy_rows(cursor, table_name, fields, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([copy_value(row[field]) for field in fields])
+    buffer.seek(0)
+    columns = ', '.join(f'"{field}"' for field in fields)
+    cursor.copy_expert(
+        f'COPY "{table_name}" ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def write_batch(table, fields, rows):
+    # returns the rows that were skipped rather than written
+    connection = db.session.connection()
+    skipped = []
+    if connection.dialect.name == 'postgresql' and table.name == 'Show':
+        # shows that overlap an existing booking hit the exclusion
+        # constraints; stage the batch and skip those instead of failing it
+        cursor = connection.connection.cursor()
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS "ShowImport" '
+                       '(LIKE "Show" INCLUDING DEFAULTS) ON COMMIT DELETE ROWS')
+        copy_rows(cursor, 'ShowImport', fields, rows)
+        columns = ', '.join(f'"{field}"' for field in fields)
+        cursor.execute(f'WITH inserted AS (INSERT INTO "Show" ({columns}) '
+                       f'SELECT {columns} FROM "ShowImport" ON CONFLICT DO NOTHING '
+                       f'RETURNING {columns}) '
+                       f'SELECT {columns} FROM "ShowImport" '
+                       f'EXCEPT ALL SELECT {columns} FROM inserted')
+        skipped = [dict(zip(fields, row)) for row in cursor.fetchall()]
+    elif connection.dialect.name == 'postgresql':
+        copy_rows(connection.connection.cursor(), table.name, fields, rows)
+    else:
+        connection.execute(table.insert(), rows)
+    db.session.commit()
+    return skipped
+
+
+IMPORTS = {
+    'venues': (Venue, VENUE_FIELDS, clean_venue),
+    'artists': (Artist, ARTIST_FIELDS, clean_artist),
+    'shows': (Show, SHOW_FIELDS, clean_show),
+}
+
+
+def import_file(kind, stream, format, rejects=None, batch_size=BATCH_SIZE):
+    model, fields, clean = IMPORTS[kind]
+    stats = {"imported": 0, "rejected": 0}
+
+    def reject(record, message):
+        stats['rejected'] += 1
+        if rejects is not None:
+            rejects.write(json.dumps({"error": message, "record": record}, default=str) + '\n')
+
+    def flush(batch):
+        if kind == 'shows':
+            batch = resolve_shows(batch, reject)
+        if batch:
+            skipped = write_batch(model.__table__, fields, batch)
+            stats['imported'] += len(batch) - len(skipped)
+            for row in skipped:
+                reject(row, 'overlaps another show at the venue or of the artist')
+
+    batch = []
+    for record in read_records(stream, format):
+        try:
+            batch.append(clean(parse_record(record)))
+        except (ValueError, TypeError, OverflowError) as error:
+            reject(record, str(error))
+            continue
+        if len(batch) == batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return stats
+
+
+@click.command('import')
+@click.argument('kind', type=click.Choice(sorted(IMPORTS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'format', type=click.Choice(['csv', 'jsonl']),
+              help='File format. Guessed from the extension when omitted.')
+@click.option('--batch-size', default=BATCH_SIZE, show_default=True)
+@click.option('--rejects', type=click.File('w'),
+              help='Write rejected rows, with the reason, to this JSON Lines file.')
+@with_appcontext
+def import_command(kind, path, format, batch_size, rejects):
+    """Bulk import venues, artists or shows from a CSV or JSON Lines file."""
+    format = format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    start = time.perf_counter()
+    with open(path, newline='' if format == 'csv' else None, encoding='utf-8') as stream:
+        stats = import_file(kind, stream, format, rejects, batch_size)
+    elapsed = time.perf_counter() - start
+    if kind == 'shows':
+        # COPY bypasses the app, so pick the new upcoming shows up here
+        roll_forward_schedule()
+    rate = stats['imported'] / elapsed if elapsed else 0
+    click.echo(f'Imported {stats["imported"]} {kind} in {elapsed:.1f}s '
+               f'({rate:.0f} rows/sec), rejected {stats["rejected"]}.')
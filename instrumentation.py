@@ -0,0 +1,66 @@
+# ----------------------------------------------------------------------------#
+# SQL instrumentation.
+# Counts the statements each request runs and the time spent in them, and
+# flags requests that run the same parameterised statement over and over
+# (the usual N+1 pattern). Listeners are only installed when
+# SQL_INSTRUMENTATION is on, so a disabled app pays nothing for it.
+# ----------------------------------------------------------------------------#
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from models import db
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if 'sql_statements' not in g:
+        g.sql_statements = Counter()
+        g.sql_time = 0.0
+    # statements reach this point with placeholders, not values, so
+    # identical text means the same statement shape
+    g.sql_statements[statement] += 1
+    g.sql_time += elapsed
+
+
+def init_instrumentation(app):
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    engine = db.get_engine(app)
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    @app.after_request
+    def report_sql(response):
+        statements = g.get('sql_statements')
+        if not statements:
+            return response
+        count = sum(statements.values())
+        duration = g.sql_time * 1000
+        response.headers.add(
+            'Server-Timing', f'db;dur={duration:.2f};desc="{count} queries"')
+        response.headers['X-DB-Query-Count'] = str(count)
+
+        threshold = app.config['SQL_REPEAT_THRESHOLD']
+        repeated = [(statement, times) for statement, times in statements.items()
+                    if times > threshold]
+        app.logger.info('%s %s: %d queries in %.2fms',
+                        request.method, request.path, count, duration)
+        for statement, times in repeated:
+            app.logger.warning('Possible N+1 in %s %s: statement ran %d times: %s',
+                               request.method, request.path, times,
+                               ' '.join(statement.split()))
+        if repeated:
+            response.headers['X-DB-Repeated-Statements'] = str(len(repeated))
+        return response
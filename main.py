@@ -0,0 +1,100 @@
+# ----------------------------------------------------------------------------#
+# Main.
+# Home page, cache and compression stats, exports, images and the error
+# pages.
+# ----------------------------------------------------------------------------#
+from flask import (Blueprint, current_app, render_template, request, Response, redirect, url_for,
+                   jsonify, stream_with_context, abort, send_file, send_from_directory)
+from werkzeug.local import LocalProxy
+from exporter import export_query, export_lines, parse_date, FORMATS
+from images import THUMBNAIL_SIZES
+from helpers import page_cache, facet_cache, api_response
+
+bp = Blueprint('main', __name__)
+images = LocalProxy(lambda: current_app.extensions['images'])
+
+
+@ bp.route('/cache/stats')
+def cache_stats():
+    return jsonify({"pages": page_cache.stats(),
+                    "facets": facet_cache.stats(),
+                    "fragments": current_app.extensions['fragment_cache'].stats(),
+                    "thumbnails": images.cache.stats(),
+                    "thumbnail_failures": images.failures.stats()})
+
+
+@ bp.route('/compression/stats')
+def compression_stats_view():
+    return jsonify(current_app.extensions['compression_stats'].stats())
+
+
+@ bp.route('/')
+def index():
+    return render_template('pages/home.html')
+
+
+#  Export
+#  ----------------------------------------------------------------
+@ bp.route('/export/<any(shows, venues, artists):kind>.<any(csv, ndjson):format>')
+def export(kind, format):
+    try:
+        start = parse_date(request.args.get('from'))
+        end = parse_date(request.args.get('to'))
+    except (ValueError, OverflowError):
+        abort(400)
+    query = export_query(kind, start, end,
+                         request.args.get('city'), request.args.get('state'))
+    response = Response(stream_with_context(export_lines(query, format)),
+                        mimetype=FORMATS[format])
+    response.headers['Content-Disposition'] = f'attachment; filename={kind}.{format}'
+    return response
+
+
+#  Images
+#  ----------------------------------------------------------------
+@ bp.route('/thumbnails/<size>/<signature>.jpg')
+def thumbnail(size, signature):
+    src = request.args.get('src', '')
+    if size not in THUMBNAIL_SIZES or not images.valid_signature(signature, src):
+        abort(404)
+    path = images.cached_thumbnail(src, size)
+    if path is None:
+        # the original until a worker has made the thumbnail
+        images.schedule(src, size)
+        response = redirect(src)
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    return send_file(path, mimetype='image/jpeg', max_age=current_app.config['THUMBNAIL_MAX_AGE'])
+
+
+@ bp.route('/images', methods=['POST'])
+def upload_image():
+    upload = request.files.get('image')
+    if upload is None:
+        return api_response({"error": "no image given"}, 400)
+    try:
+        name = images.store_upload(upload.stream)
+    except ValueError as error:
+        return api_response({"error": str(error)}, 400)
+    url = url_for('main.uploaded_image', name=name)
+    return api_response({"url": url, "thumbnail": images.thumbnail_url(url)}, 201)
+
+
+@ bp.route('/images/<name>')
+def uploaded_image(name):
+    response = send_from_directory(images.upload_dir, name)
+    # names are content hashes
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+#  Errors
+#  ----------------------------------------------------------------
+@ bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template('errors/404.html'), 404
+
+
+@ bp.app_errorhandler(500)
+def server_error(error):
+    return render_template('errors/500.html'), 500
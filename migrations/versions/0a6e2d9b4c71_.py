@@ -0,0 +1,34 @@
+"""cascade show deletes from venues and artists
+
+Revision ID: 0a6e2d9b4c71
+Revises: f2a84c6d1e59
+Create Date: 2026-10-18 21:32:50.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6e2d9b4c71'
+down_revision = 'f2a84c6d1e59'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.drop_constraint('Show_venue_id_fkey', type_='foreignkey')
+        batch_op.drop_constraint('Show_artist_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('Show_venue_id_fkey', 'Venue', ['venue_id'], ['id'],
+                                    ondelete='CASCADE')
+        batch_op.create_foreign_key('Show_artist_id_fkey', 'Artist', ['artist_id'], ['id'],
+                                    ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.drop_constraint('Show_artist_id_fkey', type_='foreignkey')
+        batch_op.drop_constraint('Show_venue_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('Show_artist_id_fkey', 'Artist', ['artist_id'], ['id'])
+        batch_op.create_foreign_key('Show_venue_id_fkey', 'Venue', ['venue_id'], ['id'])
@@ -0,0 +1,42 @@
+"""not null keyset sort columns
+
+Revision ID: 3f7b9d2c5a18
+Revises: 0a6e2d9b4c71
+Create Date: 2026-10-19 09:14:26.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7b9d2c5a18'
+down_revision = '0a6e2d9b4c71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the listings page on (state, city, id) and (start_time, id); a NULL in a
+    # row-value comparison matches neither side of a page boundary, so those
+    # rows were skipped. Shows without a start time never showed on a venue
+    # or artist page and cannot be booked, so they are dropped.
+    op.execute('''UPDATE "Venue" SET city = '' WHERE city IS NULL''')
+    op.execute('''UPDATE "Venue" SET state = '' WHERE state IS NULL''')
+    op.execute('''DELETE FROM "Show" WHERE start_time IS NULL''')
+
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.alter_column('city', existing_type=sa.String(length=120), nullable=False)
+        batch_op.alter_column('state', existing_type=sa.String(length=120), nullable=False)
+
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.alter_column('start_time', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.alter_column('start_time', existing_type=sa.DateTime(), nullable=True)
+
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.alter_column('state', existing_type=sa.String(length=120), nullable=True)
+        batch_op.alter_column('city', existing_type=sa.String(length=120), nullable=True)
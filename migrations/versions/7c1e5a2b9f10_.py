@@ -0,0 +1,34 @@
+"""trigram search indexes
+
+Revision ID: 7c1e5a2b9f10
+Revises: 66ea6c4b686a
+Create Date: 2026-10-18 10:12:41.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e5a2b9f10'
+down_revision = '66ea6c4b686a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in ('Venue', 'Artist'):
+        for column in ('name', 'city', 'state'):
+            op.create_index(f'ix_{table}_{column}_trgm', table, [column],
+                            postgresql_using='gin',
+                            postgresql_ops={column: 'gin_trgm_ops'})
+        op.create_index(f'ix_{table}_genres', table, ['genres'],
+                        postgresql_using='gin')
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        op.drop_index(f'ix_{table}_genres', table_name=table)
+        for column in ('state', 'city', 'name'):
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
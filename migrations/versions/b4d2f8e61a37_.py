@@ -0,0 +1,42 @@
+"""show and venue lookup indexes
+
+Revision ID: b4d2f8e61a37
+Revises: 7c1e5a2b9f10
+Create Date: 2026-10-18 14:03:55.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d2f8e61a37'
+down_revision = '7c1e5a2b9f10'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # detail pages: a venue's/artist's shows in start_time order
+    ('ix_Show_venue_id_start_time', 'Show', ['venue_id', 'start_time']),
+    ('ix_Show_artist_id_start_time', 'Show', ['artist_id', 'start_time']),
+    # /shows listing and its (start_time, id) keyset cursor
+    ('ix_Show_start_time_id', 'Show', ['start_time', 'id']),
+    # /venues listing and its (state, city, id) keyset cursor
+    ('ix_Venue_state_city_id', 'Venue', ['state', 'city', 'id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction, and keeps the tables
+    # writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table,
+                          postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""upcoming shows schedule table
+
+Revision ID: d91a3c5e7b24
+Revises: b4d2f8e61a37
+Create Date: 2026-10-18 16:40:08.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91a3c5e7b24'
+down_revision = 'b4d2f8e61a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('UpcomingShow',
+    sa.Column('show_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('venue_name', sa.String(), nullable=True),
+    sa.Column('venue_image_link', sa.String(length=500), nullable=True),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('artist_name', sa.String(), nullable=True),
+    sa.Column('artist_image_link', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['show_id'], ['Show.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('show_id')
+    )
+    op.create_index('ix_UpcomingShow_venue_id_start_time', 'UpcomingShow', ['venue_id', 'start_time'])
+    op.create_index('ix_UpcomingShow_artist_id_start_time', 'UpcomingShow', ['artist_id', 'start_time'])
+    op.create_index('ix_UpcomingShow_start_time', 'UpcomingShow', ['start_time'])
+    op.execute('''
+        INSERT INTO "UpcomingShow" (show_id, start_time, venue_id, venue_name, venue_image_link,
+                                    artist_id, artist_name, artist_image_link)
+        SELECT "Show".id, "Show".start_time,
+               "Venue".id, "Venue".name, "Venue".image_link,
+               "Artist".id, "Artist".name, "Artist".image_link
+        FROM "Show"
+        JOIN "Venue" ON "Venue".id = "Show".venue_id
+        JOIN "Artist" ON "Artist".id = "Show".artist_id
+        WHERE "Show".start_time > now()
+    ''')
+
+
+def downgrade():
+    op.drop_index('ix_UpcomingShow_start_time', table_name='UpcomingShow')
+    op.drop_index('ix_UpcomingShow_artist_id_start_time', table_name='UpcomingShow')
+    op.drop_index('ix_UpcomingShow_venue_id_start_time', table_name='UpcomingShow')
+    op.drop_table('UpcomingShow')
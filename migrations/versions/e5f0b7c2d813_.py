@@ -0,0 +1,39 @@
+"""show end times and overlap exclusion constraints
+
+Revision ID: e5f0b7c2d813
+Revises: d91a3c5e7b24
+Create Date: 2026-10-18 18:21:37.000000
+
+Shows that already overlap at the same venue or with the same artist make
+the constraints fail to build; move or delete them first.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f0b7c2d813'
+down_revision = 'd91a3c5e7b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # btree_gist lets the plain integer ids share a GiST index with the ranges
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('end_time', sa.DateTime(), nullable=True))
+    op.execute('''UPDATE "Show" SET end_time = start_time + interval '2 hours' ''')
+    for column in ('venue_id', 'artist_id'):
+        op.execute(f'''
+            ALTER TABLE "Show" ADD CONSTRAINT "ex_Show_{column}_overlap"
+            EXCLUDE USING gist ({column} WITH =, tsrange(start_time, end_time) WITH &&)
+            WHERE (start_time IS NOT NULL)
+        ''')
+
+
+def downgrade():
+    for column in ('artist_id', 'venue_id'):
+        op.execute(f'ALTER TABLE "Show" DROP CONSTRAINT "ex_Show_{column}_overlap"')
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.drop_column('end_time')
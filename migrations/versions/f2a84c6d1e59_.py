@@ -0,0 +1,32 @@
+"""venue and artist version columns
+
+Revision ID: f2a84c6d1e59
+Revises: e5f0b7c2d813
+Create Date: 2026-10-18 20:05:12.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a84c6d1e59'
+down_revision = 'e5f0b7c2d813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Artist', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('Artist', schema=None) as batch_op:
+        batch_op.drop_column('version')
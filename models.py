@@ -3,6 +3,7 @@
 # ----------------------------------------------------------------------------#
 import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import ARRAY
 
 # ----------------------------------------------------------------------------#
 # Models.
@@ -10,45 +11,93 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 
+def search_indexes(table):
+    # pg_trgm indexes behind search.py, see migration 7c1e5a2b9f10
+    return tuple(db.Index(f'ix_{table}_{column}_trgm', column, postgresql_using='gin',
+                          postgresql_ops={column: 'gin_trgm_ops'})
+                 for column in ('name', 'city', 'state')) + (
+        db.Index(f'ix_{table}_genres', 'genres', postgresql_using='gin'),)
+
+
 class Venue(db.Model):
     __tablename__ = 'Venue'
+    __table_args__ = search_indexes('Venue') + (
+        db.Index('ix_Venue_state_city_id', 'state', 'city', 'id'),)
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String)
-    city = db.Column(db.String(120))
-    state = db.Column(db.String(120))
+    # NOT NULL: part of the /venues keyset, see VENUES_SORT_KEY
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False)
     address = db.Column(db.String(120))
     phone = db.Column(db.String(120))
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
     website_link = db.Column(db.String(120))
-    genres = db.Column(db.ARRAY(db.String()), nullable=False)
+    # the PostgreSQL ARRAY, for the && and @> genre filters in search.py
+    genres = db.Column(ARRAY(db.String()), nullable=False)
     seeking_talent = db.Column(db.Boolean, nullable=False)
     seeking_description = db.Column(db.String(200))
-    venue_id = db.relationship('Show', backref='show_id')
+    # bumped by every edit, see update_if_unchanged in helpers.py
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    venue_id = db.relationship('Show', backref='show_id', passive_deletes=True)
 
 
 class Artist(db.Model):
     __tablename__ = 'Artist'
+    __table_args__ = search_indexes('Artist')
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String)
     city = db.Column(db.String(120))
     state = db.Column(db.String(120))
     phone = db.Column(db.String(120))
-    genres = db.Column(db.ARRAY(db.String()), nullable=False)
+    genres = db.Column(ARRAY(db.String()), nullable=False)
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
     website_link = db.Column(db.String(120))
     seeking_venue = db.Column(db.Boolean, nullable=False)
     seeking_description = db.Column(db.String(200))
-    artist_id = db.relationship('Show', backref='art_show_id')
+    # bumped by every edit, see update_if_unchanged in helpers.py
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    artist_id = db.relationship('Show', backref='art_show_id', passive_deletes=True)
 
 
 class Show(db.Model):
     __tablename__ = 'Show'
+    __table_args__ = (
+        db.Index('ix_Show_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_Show_artist_id_start_time', 'artist_id', 'start_time'),
+        db.Index('ix_Show_start_time_id', 'start_time', 'id'),
+    )
+    # no two shows may overlap at one venue or for one artist; enforced by
+    # the ex_Show_venue_id_overlap/ex_Show_artist_id_overlap exclusion
+    # constraints on tsrange(start_time, end_time), see migration e5f0b7c2d813
     id = db.Column(db.Integer, primary_key=True)
-    start_time = db.Column(db.DateTime)
-    venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id'), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime)
+    venue_id = db.Column(db.Integer, db.ForeignKey(
+        'Venue.id', ondelete='CASCADE'), nullable=False)
     artist_id = db.Column(db.Integer, db.ForeignKey(
-        'Artist.id'), nullable=False)
+        'Artist.id', ondelete='CASCADE'), nullable=False)
+
+
+class UpcomingShow(db.Model):
+    # denormalised copy of the shows that have not started yet, maintained
+    # by schedule.py
+    __tablename__ = 'UpcomingShow'
+    __table_args__ = (
+        db.Index('ix_UpcomingShow_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_UpcomingShow_artist_id_start_time', 'artist_id', 'start_time'),
+        db.Index('ix_UpcomingShow_start_time', 'start_time'),
+    )
+    show_id = db.Column(db.Integer, db.ForeignKey(
+        'Show.id', ondelete='CASCADE'), primary_key=True)
+    start_time = db.Column(db.DateTime, nullable=False)
+    venue_id = db.Column(db.Integer, nullable=False)
+    venue_name = db.Column(db.String)
+    venue_image_link = db.Column(db.String(500))
+    artist_id = db.Column(db.Integer, nullable=False)
+    artist_name = db.Column(db.String)
+    artist_image_link = db.Column(db.String(500))
+    show = db.relationship('Show')
@@ -0,0 +1,75 @@
+# ----------------------------------------------------------------------------#
+# Keyset pagination.
+# Pages are addressed by the sort key of their first/last row instead of an
+# OFFSET, so page 1000 costs the same index range scan as page 1.
+# ----------------------------------------------------------------------------#
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_, DateTime, Integer, String
+
+# the range of a PostgreSQL integer column
+INTEGER_RANGE = range(-2 ** 31, 2 ** 31)
+
+
+def encode_cursor(values):
+    values = [value.isoformat() if isinstance(value, datetime) else value
+              for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def cursor_value(value, column):
+    # cursors come from the query string, so each value must fit its column
+    # before it goes into the comparison
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Integer):
+        if isinstance(value, bool) or not isinstance(value, int) or value not in INTEGER_RANGE:
+            raise ValueError(f'not an integer: {value!r}')
+    elif isinstance(column.type, String):
+        if not isinstance(value, str) or '\x00' in value:
+            raise ValueError(f'not a string: {value!r}')
+    return value
+
+
+def decode_cursor(cursor, columns):
+    # a cursor that does not fit the sort key counts as no cursor
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            return None
+        return [cursor_value(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_page(query, columns, page_size, after=None, before=None):
+    # columns is the unique ascending sort key, e.g. (Show.start_time, Show.id),
+    # and must be NOT NULL: a NULL never compares greater or less, so its rows
+    # would fall between pages.
+    # Returns the rows of the page plus the cursors of its neighbours.
+    key = tuple_(*columns)
+    before_values = decode_cursor(before, columns) if before else None
+    after_values = decode_cursor(after, columns) if after else None
+
+    if before_values is not None:
+        rows = query.filter(key < tuple_(*before_values)).order_by(
+            *[column.desc() for column in columns]).limit(page_size + 1).all()
+        has_previous = len(rows) > page_size
+        rows = rows[:page_size]
+        rows.reverse()
+        has_next = True
+    else:
+        if after_values is not None:
+            query = query.filter(key > tuple_(*after_values))
+        rows = query.order_by(*columns).limit(page_size + 1).all()
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_previous = after_values is not None
+
+    def row_key(row):
+        return encode_cursor([getattr(row, column.key) for column in columns])
+
+    return {"rows": rows,
+            "next_cursor": row_key(rows[-1]) if rows and has_next else None,
+            "prev_cursor": row_key(rows[0]) if rows and has_previous else None}
@@ -0,0 +1,102 @@
+# ----------------------------------------------------------------------------#
+# Upcoming shows schedule.
+# UpcomingShow holds only the shows that have not started yet, already joined
+# with the venue/artist fields the pages display, so read paths never filter
+# the whole Show history. New shows are added when they are created, renames
+# are copied over on edit, and `flask schedule roll-forward` (run from cron)
+# drops shows that have started and picks up shows added behind the app's
+# back, e.g. by `flask import`.
+# ----------------------------------------------------------------------------#
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import and_, select
+from models import db, Venue, Artist, Show, UpcomingShow
+
+SCHEDULE_COLUMNS = ['show_id', 'start_time', 'venue_id', 'venue_name', 'venue_image_link',
+                    'artist_id', 'artist_name', 'artist_image_link']
+
+
+def upcoming_venue_shows_query():
+    # same columns as venue_shows_query in venues.py
+    return db.session.query(
+        UpcomingShow.venue_id,
+        UpcomingShow.start_time,
+        UpcomingShow.artist_id,
+        UpcomingShow.artist_name,
+        UpcomingShow.artist_image_link
+    ).order_by(UpcomingShow.start_time)
+
+
+def upcoming_artist_shows_query():
+    # same columns as artist_shows_query in artists.py
+    return db.session.query(
+        UpcomingShow.artist_id,
+        UpcomingShow.start_time,
+        UpcomingShow.venue_id,
+        UpcomingShow.venue_name,
+        UpcomingShow.venue_image_link
+    ).order_by(UpcomingShow.start_time)
+
+
+def schedule_show(show, venue, artist, now=None):
+    # call before committing the show, so both land in one transaction
+    if show.start_time is None or show.start_time <= (now or datetime.now()):
+        return
+    db.session.add(UpcomingShow(show=show,
+                                start_time=show.start_time,
+                                venue_id=venue.id,
+                                venue_name=venue.name,
+                                venue_image_link=venue.image_link,
+                                artist_id=artist.id,
+                                artist_name=artist.name,
+                                artist_image_link=artist.image_link))
+
+
+def update_scheduled_venue(venue_id, name, image_link):
+    UpcomingShow.query.filter(UpcomingShow.venue_id == venue_id).update(
+        {"venue_name": name, "venue_image_link": image_link},
+        synchronize_session=False)
+
+
+def update_scheduled_artist(artist_id, name, image_link):
+    UpcomingShow.query.filter(UpcomingShow.artist_id == artist_id).update(
+        {"artist_name": name, "artist_image_link": image_link},
+        synchronize_session=False)
+
+
+def missing_upcoming_shows(now):
+    # future shows not in the schedule yet, joined with their display fields
+    return select([
+        Show.id, Show.start_time,
+        Venue.id.label('venue_id'), Venue.name.label('venue_name'),
+        Venue.image_link.label('venue_image_link'),
+        Artist.id.label('artist_id'), Artist.name.label('artist_name'),
+        Artist.image_link.label('artist_image_link')
+    ]).select_from(Show.__table__.join(Venue.__table__, Show.venue_id == Venue.id)
+                   .join(Artist.__table__, Show.artist_id == Artist.id)
+                   .outerjoin(UpcomingShow.__table__, UpcomingShow.show_id == Show.id)
+                   ).where(and_(Show.start_time > now, UpcomingShow.show_id.is_(None)))
+
+
+def roll_forward_schedule(now=None):
+    now = now or datetime.now()
+    started = UpcomingShow.query.filter(UpcomingShow.start_time <= now).delete(
+        synchronize_session=False)
+    added = db.session.execute(UpcomingShow.__table__.insert().from_select(
+        SCHEDULE_COLUMNS, missing_upcoming_shows(now))).rowcount
+    db.session.commit()
+    return started, added
+
+
+@click.group('schedule')
+def schedule_cli():
+    """Maintain the upcoming shows schedule."""
+
+
+@schedule_cli.command('roll-forward')
+@with_appcontext
+def roll_forward_command():
+    """Drop started shows and add any missing upcoming ones."""
+    started, added = roll_forward_schedule()
+    click.echo(f'Removed {started} started shows, added {added} upcoming shows.')
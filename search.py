@@ -0,0 +1,73 @@
+# ----------------------------------------------------------------------------#
+# Search.
+# Trigram-backed search over venues and artists. The GIN indexes live in
+# migration 7c1e5a2b9f10; ilike '%term%' and similarity() are both served
+# from them by PostgreSQL's pg_trgm extension, and the genre filters below
+# (@> and && on the genres arrays) by the GIN indexes on genres.
+# ----------------------------------------------------------------------------#
+from sqlalchemy import func, or_, and_
+from models import db
+from genres import GENRES
+
+
+def matching_genres(search_term):
+    term = search_term.lower()
+    return [genre for genre in GENRES if term in genre.lower()]
+
+
+def search_filter(model, search_term):
+    pattern = f'%{search_term}%'
+    conditions = [model.name.ilike(pattern),
+                  model.city.ilike(pattern),
+                  model.state.ilike(pattern)]
+
+    # "San Francisco, CA" searches by city and state
+    if ',' in search_term:
+        city, state = [part.strip() for part in search_term.rsplit(',', 1)]
+        conditions.append(and_(model.city.ilike(city), model.state.ilike(state)))
+
+    genres = matching_genres(search_term)
+    if genres:
+        conditions.append(model.genres.overlap(genres))
+
+    return or_(*conditions)
+
+
+def search_rank(model, search_term):
+    return func.greatest(func.similarity(model.name, search_term),
+                         func.similarity(model.city, search_term),
+                         func.similarity(model.state, search_term))
+
+
+def genre_filter(model, genres, match='any'):
+    # 'all': has every selected genre (containment), 'any': overlaps them
+    if match == 'all':
+        return model.genres.contains(genres)
+    return model.genres.overlap(genres)
+
+
+def filter_genres(query, model, genres, match='any'):
+    if genres:
+        query = query.filter(genre_filter(model, genres, match))
+    return query
+
+
+def genre_facets(model, genres=None, match='any'):
+    # genre -> number of matching rows, most common first
+    matching = filter_genres(db.session.query(
+        func.unnest(model.genres).label('genre')), model, genres, match).subquery()
+    count = func.count().label('count')
+    rows = db.session.query(matching.c.genre, count).group_by(
+        matching.c.genre).order_by(db.desc(count), matching.c.genre)
+    return [(genre, count) for genre, count in rows]
+
+
+def search(model, search_term, limit, genres=None, match='any'):
+    search_term = search_term.strip()
+    query = filter_genres(db.session.query(model.id, model.name), model, genres, match)
+    if search_term:
+        query = query.filter(search_filter(model, search_term)).order_by(
+            db.desc(search_rank(model, search_term)), model.name)
+    else:
+        query = query.order_by(model.name)
+    return query.limit(limit).all()
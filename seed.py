@@ -0,0 +1,163 @@
+# ----------------------------------------------------------------------------#
+# Synthetic data.
+# Generates venues, artists and shows with roughly realistic distributions:
+# many cities, a few very popular venues/artists and a long tail, and shows
+# spread over the past two years and the coming year.
+# Usage: flask seed --venues 1000 --artists 2000 --shows 20000
+# ----------------------------------------------------------------------------#
+import random
+from itertools import accumulate
+from datetime import datetime, timedelta
+import click
+from flask.cli import with_appcontext
+from models import db, Venue, Artist, Show
+from schedule import roll_forward_schedule
+from genres import GENRES
+
+CITIES = [
+    ('New York', 'NY'), ('Los Angeles', 'CA'), ('Chicago', 'IL'), ('Houston', 'TX'),
+    ('Phoenix', 'AZ'), ('Philadelphia', 'PA'), ('San Antonio', 'TX'), ('San Diego', 'CA'),
+    ('Dallas', 'TX'), ('San Jose', 'CA'), ('Austin', 'TX'), ('Jacksonville', 'FL'),
+    ('Columbus', 'OH'), ('Charlotte', 'NC'), ('San Francisco', 'CA'), ('Indianapolis', 'IN'),
+    ('Seattle', 'WA'), ('Denver', 'CO'), ('Washington', 'DC'), ('Boston', 'MA'),
+    ('Nashville', 'TN'), ('Detroit', 'MI'), ('Portland', 'OR'), ('Las Vegas', 'NV'),
+    ('Memphis', 'TN'), ('Louisville', 'KY'), ('Baltimore', 'MD'), ('Milwaukee', 'WI'),
+    ('Albuquerque', 'NM'), ('Tucson', 'AZ'), ('Fresno', 'CA'), ('Sacramento', 'CA'),
+    ('Atlanta', 'GA'), ('Miami', 'FL'), ('Oakland', 'CA'), ('Minneapolis', 'MN'),
+    ('Tulsa', 'OK'), ('New Orleans', 'LA'), ('Cleveland', 'OH'), ('Honolulu', 'HI'),
+]
+WORDS = ['Blue', 'Red', 'Velvet', 'Electric', 'Golden', 'Midnight', 'Silver', 'Wild',
+         'Little', 'Broken', 'Neon', 'Hollow', 'Rolling', 'Quiet', 'Lucky', 'Iron']
+VENUE_NOUNS = ['Hall', 'Room', 'Lounge', 'Club', 'Theatre', 'Bar', 'Garage', 'Cellar']
+ARTIST_NOUNS = ['Owls', 'Band', 'Collective', 'Trio', 'Riders', 'Kings', 'Sisters', 'Echo']
+BATCH_SIZE = 1000
+SHOW_HOURS = 2
+
+
+def zipf_weights(count, exponent=1.1):
+    # a handful of entries get most of the traffic, the rest form a long tail.
+    # cumulative, so random.choices can bisect instead of summing every call
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def name(rng, nouns, index):
+    return f'{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(nouns)} {index}'
+
+
+def fake_venue(rng, index, city_weights):
+    city, state = rng.choices(CITIES, cum_weights=city_weights)[0]
+    return {"name": name(rng, VENUE_NOUNS, index),
+            "city": city,
+            "state": state,
+            "address": f'{rng.randint(1, 9999)} {rng.choice(WORDS)} Street',
+            "phone": f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            "image_link": '',
+            "facebook_link": f'https://www.facebook.com/venue{index}',
+            "website_link": f'https://www.venue{index}.com',
+            "genres": rng.sample(GENRES, rng.randint(1, 3)),
+            "seeking_talent": rng.random() < 0.3,
+            "seeking_description": ''}
+
+
+def fake_artist(rng, index, city_weights):
+    city, state = rng.choices(CITIES, cum_weights=city_weights)[0]
+    return {"name": name(rng, ARTIST_NOUNS, index),
+            "city": city,
+            "state": state,
+            "phone": f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            "genres": rng.sample(GENRES, rng.randint(1, 3)),
+            "image_link": '',
+            "facebook_link": f'https://www.facebook.com/artist{index}',
+            "website_link": f'https://www.artist{index}.com',
+            "seeking_venue": rng.random() < 0.3,
+            "seeking_description": ''}
+
+
+def insert_batches(model, rows):
+    # returns the number of rows inserted
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            db.session.bulk_insert_mappings(model, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.bulk_insert_mappings(model, batch)
+        count += len(batch)
+    db.session.commit()
+    return count
+
+
+def seed_database(venues, artists, shows, seed=None):
+    # returns the number of shows inserted, which can be fewer than asked
+    # for when the venues and artists are too busy to fit them all
+    rng = random.Random(seed)
+    city_weights = zipf_weights(len(CITIES), 0.8)
+
+    insert_batches(Venue, (fake_venue(rng, i, city_weights) for i in range(venues)))
+    insert_batches(Artist, (fake_artist(rng, i, city_weights) for i in range(artists)))
+
+    venue_ids = [id for (id,) in db.session.query(Venue.id).order_by(Venue.id)]
+    artist_ids = [id for (id,) in db.session.query(Artist.id).order_by(Artist.id)]
+    if not venue_ids or not artist_ids:
+        return 0
+    # shuffle so popularity is not tied to insertion order
+    rng.shuffle(venue_ids)
+    rng.shuffle(artist_ids)
+    venue_weights = zipf_weights(len(venue_ids))
+    artist_weights = zipf_weights(len(artist_ids))
+
+    # two years of history and one year of upcoming shows, on the hour
+    earliest = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=730)
+    span_hours = (730 + 365) * 24
+    # hours at which each venue/artist already has a show starting, so no two
+    # shows overlap (see the exclusion constraints on Show)
+    venue_hours = {}
+    artist_hours = {}
+
+    def free(booked, hour):
+        return all(hour + offset not in booked
+                   for offset in range(1 - SHOW_HOURS, SHOW_HOURS))
+
+    def fake_shows():
+        for _ in range(shows):
+            # popular venues/artists fill up, so give up after a few tries
+            for _ in range(10):
+                hour = rng.randrange(span_hours)
+                venue_id = rng.choices(venue_ids, cum_weights=venue_weights)[0]
+                artist_id = rng.choices(artist_ids, cum_weights=artist_weights)[0]
+                booked_venue = venue_hours.setdefault(venue_id, set())
+                booked_artist = artist_hours.setdefault(artist_id, set())
+                if free(booked_venue, hour) and free(booked_artist, hour):
+                    break
+            else:
+                continue
+            booked_venue.add(hour)
+            booked_artist.add(hour)
+            start_time = earliest + timedelta(hours=hour)
+            yield {"start_time": start_time,
+                   "end_time": start_time + timedelta(hours=SHOW_HOURS),
+                   "venue_id": venue_id,
+                   "artist_id": artist_id}
+
+    inserted = insert_batches(Show, fake_shows())
+    # bulk inserts bypass schedule_show, so fill UpcomingShow in one go
+    roll_forward_schedule()
+    return inserted
+
+
+@click.command('seed')
+@click.option('--venues', default=100, show_default=True)
+@click.option('--artists', default=200, show_default=True)
+@click.option('--shows', default=1000, show_default=True)
+@click.option('--seed', 'random_seed', type=int, default=None,
+              help='Random seed, for reproducible data sets.')
+@with_appcontext
+def seed_command(venues, artists, shows, random_seed):
+    """Fill the database with synthetic venues, artists and shows."""
+    inserted = seed_database(venues, artists, shows, random_seed)
+    click.echo(f'Seeded {venues} venues, {artists} artists and {inserted} shows.')
+    if inserted < shows:
+        click.echo(f'{shows - inserted} shows did not fit without double bookings.')
@@ -0,0 +1,25 @@
+# ----------------------------------------------------------------------------#
+# JSON serialisation for the API.
+# Uses orjson when it is installed, which is several times faster than the
+# standard library on large batches, and falls back to json otherwise. Both
+# paths write datetimes as ISO 8601.
+# ----------------------------------------------------------------------------#
+import json
+from datetime import date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def to_json(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=default, separators=(',', ':')).encode()
@@ -0,0 +1,122 @@
+# ----------------------------------------------------------------------------#
+# Shows.
+# The show listing, booking form and JSON API. WTForms is imported in the
+# views that need it.
+# ----------------------------------------------------------------------------#
+from datetime import timedelta
+from flask import Blueprint, current_app, render_template, request, flash
+from sqlalchemy.exc import IntegrityError
+from models import db, Venue, Artist, Show
+from schedule import schedule_show
+from pagination import keyset_page
+from helpers import (page_cache, default_pic, page_cursors, api_response,
+                     api_columns, api_fetch)
+
+bp = Blueprint('shows', __name__)
+
+
+SHOWS_SORT_KEY = (Show.start_time, Show.id)
+
+
+def shows_listing_columns():
+    return [Show.id,
+            Show.start_time,
+            Venue.id.label('venue_id'),
+            Venue.name.label('venue_name'),
+            Artist.id.label('artist_id'),
+            Artist.name.label('artist_name'),
+            Artist.image_link.label('artist_image_link')]
+
+
+def shows_listing_query(columns=None):
+    # one joined query for the listing instead of two lookups per show
+    query = db.session.query(*(columns or shows_listing_columns())).select_from(Show)
+    return query.join(Venue, Show.venue_id == Venue.id
+                      ).join(Artist, Show.artist_id == Artist.id)
+
+
+def shows_info(row):
+    return {"venue_id": row.venue_id,
+            "venue_name": row.venue_name,
+            "artist_id": row.artist_id,
+            "artist_name": row.artist_name,
+            "artist_image_link": default_pic(False, row.artist_image_link),
+            "start_time": row.start_time}
+
+
+@ bp.route('/shows')
+def shows():
+    page = keyset_page(shows_listing_query(), SHOWS_SORT_KEY,
+                       current_app.config['PAGE_SIZE'], **page_cursors())
+    data = [shows_info(row) for row in page['rows']]
+    return render_template('pages/shows.html', shows=data, page=page)
+
+
+@ bp.route('/shows/create')
+def create_shows():
+    # renders form. do not touch.
+    from forms import ShowForm
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+
+def show_end_time(start_time, duration):
+    if start_time is None:
+        return None
+    return start_time + timedelta(minutes=duration or current_app.config['DEFAULT_SHOW_MINUTES'])
+
+
+def booking_conflict_message(error):
+    # exclusion_violation from ex_Show_venue_id_overlap/ex_Show_artist_id_overlap
+    if getattr(error.orig, 'pgcode', None) != '23P01':
+        return 'There was something wrong during the posting. Try it again.'
+    if 'artist_id' in (error.orig.diag.constraint_name or ''):
+        return 'The artist already has a show at that time.'
+    return 'The venue is already booked at that time.'
+
+
+@ bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+    message = ''
+    try:
+        from forms import ShowForm
+        form = ShowForm(request.form, meta={'csrf': False})
+        if not form.validate():
+            # e.g. a duration under a minute, which would end before it starts
+            errors = '; '.join(f'{name}: {" ".join(messages)}'
+                               for name, messages in form.errors.items())
+            flash(f'The show could not be listed. {errors}')
+            return render_template('forms/new_show.html', form=form)
+        show = Show(
+            start_time=form.start_time.data,
+            end_time=show_end_time(form.start_time.data, form.duration.data),
+            venue_id=form.venue_id.data,
+            artist_id=form.artist_id.data)
+        venue = Venue.query.filter_by(id=show.venue_id).first()
+        artist = Artist.query.filter_by(id=show.artist_id).first()
+        artist_name = artist.name
+        venue_name = venue.name
+        db.session.add(show)
+        schedule_show(show, venue, artist)
+        db.session.commit()
+        page_cache.invalidate(('venue', venue.id), ('artist', artist.id))
+        message = f'{artist.name} show in {venue.name} was successfully listed!'
+    except IntegrityError as e:
+        db.session.rollback()
+        message = booking_conflict_message(e)
+    except Exception as e:
+        db.session.rollback()
+        message = 'There was something wrong during the posting. Try it again.'
+    finally:
+        db.session.close()
+    flash(message)
+    return render_template('pages/home.html')
+
+
+#  API
+#  ----------------------------------------------------------------
+@ bp.route('/api/shows')
+def api_shows():
+    columns = {column.key: column for column in shows_listing_columns()}
+    data, page = api_fetch(shows_listing_query(api_columns(columns)), Show.id)
+    return api_response({"data": data, **page})
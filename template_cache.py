@@ -0,0 +1,49 @@
+# ----------------------------------------------------------------------------#
+# Template caching.
+# Compiled templates go to an on-disk bytecode cache shared by every worker
+# of the same user, so a fresh process loads them instead of compiling them
+# again. Repeated
+# blocks such as the show tiles are cached as rendered HTML, keyed by a hash
+# of the rows they show: any change to those rows gives a new key.
+# Usage in a template:
+#   {% call cached_fragment('show-tiles', shows) %} ... {% endcall %}
+# ----------------------------------------------------------------------------#
+import hashlib
+import os
+import stat
+from jinja2 import FileSystemBytecodeCache
+
+
+def content_key(content):
+    # repr covers the dicts, lists, Rows and datetimes the views pass in
+    return hashlib.blake2b(repr(content).encode(), digest_size=16).hexdigest()
+
+
+def private_directory(directory):
+    # Jinja loads whatever bytecode it finds there, so nobody else may be
+    # able to put files in it
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        raise RuntimeError(f'{directory} is not owned by the current user.')
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise RuntimeError(f'{directory} is writable by other users.')
+    return directory
+
+
+def init_template_cache(app, fragment_cache):
+    if app.config['JINJA_BYTECODE_CACHE']:
+        directory = app.config['JINJA_BYTECODE_CACHE_DIR']
+        # without a directory Jinja makes and checks a per-user one itself
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+            private_directory(directory) if directory else None)
+
+    def cached_fragment(name, *content, caller):
+        key = (name, content_key(content))
+        html = fragment_cache.get(key)
+        if html is None:
+            html = caller()
+            fragment_cache.set(key, html)
+        return html
+
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
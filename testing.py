@@ -0,0 +1,40 @@
+# ----------------------------------------------------------------------------#
+# Scratch databases.
+# The tests and the benchmarks run against a throwaway PostgreSQL database
+# named by TEST_DATABASE_URL or BENCHMARK_DATABASE_URL. rebuild_schema DROPS
+# every table in it and recreates the schema from the migrations, so never
+# point those variables at real data.
+# ----------------------------------------------------------------------------#
+import os
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+
+def use_scratch_database(variable):
+    # returns the URL in the variable, or None; must run before config.py is
+    # imported, which reads DATABASE_URL once
+    url = os.environ.get(variable)
+    if url:
+        os.environ['DATABASE_URL'] = url
+    return url
+
+
+def rebuild_schema(app, url):
+    # app comes from create_app(commands=True, overrides={'TESTING': True});
+    # refuses to touch anything but the scratch database at url
+    from flask_migrate import upgrade
+    from sqlalchemy import text
+    from sqlalchemy.engine.url import make_url
+    from models import db
+
+    if not app.testing:
+        raise RuntimeError('rebuild_schema needs an app created with TESTING set.')
+    if make_url(app.config['SQLALCHEMY_DATABASE_URI']) != make_url(url):
+        raise RuntimeError('The app is not connected to the scratch database; '
+                           'call use_scratch_database before importing app.')
+    with app.app_context():
+        db.drop_all()
+        db.session.execute(text('DROP TABLE IF EXISTS alembic_version'))
+        db.session.commit()
+        upgrade(directory=MIGRATIONS)
+        db.session.remove()
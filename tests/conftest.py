@@ -0,0 +1,117 @@
+# ----------------------------------------------------------------------------#
+# Test fixtures.
+# The tests need PostgreSQL (arrays, pg_trgm, exclusion constraints), so they
+# run against the scratch database at TEST_DATABASE_URL and are skipped when
+# it is not set. The schema is DROPPED and rebuilt from the migrations (see
+# testing.py), and every table is emptied before each test, so never point
+# it at real data.
+# Usage: TEST_DATABASE_URL=postgresql://... python -m pytest tests
+# ----------------------------------------------------------------------------#
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from testing import use_scratch_database, rebuild_schema  # noqa: E402
+
+TEST_DATABASE_URL = use_scratch_database('TEST_DATABASE_URL')
+CACHES = ('page_cache', 'facet_cache', 'fragment_cache')
+
+
+@pytest.fixture(scope='session')
+def app():
+    if not TEST_DATABASE_URL:
+        pytest.skip('set TEST_DATABASE_URL to a scratch PostgreSQL database')
+    from app import create_app
+
+    app = create_app(commands=True, overrides={'TESTING': True})
+    # from the migrations, so the indexes and constraints are there
+    rebuild_schema(app, TEST_DATABASE_URL)
+    return app
+
+
+@pytest.fixture
+def reset_database(app):
+    from sqlalchemy import text
+    from models import db
+
+    def reset():
+        with app.app_context():
+            db.session.execute(text('TRUNCATE "UpcomingShow", "Show", "Venue", "Artist" '
+                                    'RESTART IDENTITY CASCADE'))
+            db.session.commit()
+            db.session.remove()
+        clear_caches(app)
+    return reset
+
+
+def clear_caches(app):
+    for name in CACHES:
+        app.extensions[name].clear()
+
+
+@pytest.fixture
+def client(app, reset_database):
+    reset_database()
+    return app.test_client()
+
+
+@pytest.fixture
+def count_statements(app):
+    # runs one request and returns how many statements it sent, leaving out
+    # the per-transaction set_config('statement_timeout') from database.py
+    from sqlalchemy import event
+    from models import db
+
+    with app.app_context():
+        engine = db.engine
+
+    def count(client, path, method='GET', data=None):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'set_config' not in statement:
+                statements.append(statement)
+
+        clear_caches(app)
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            response = client.open(path, method=method, data=data)
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert response.status_code == 200, path
+        return len(statements)
+    return count
+
+
+@pytest.fixture
+def add_venue(app):
+    from models import db, Venue
+
+    def add(name, genres, city='San Francisco', state='CA', **fields):
+        with app.app_context():
+            venue = Venue(name=name, genres=genres, city=city, state=state,
+                          seeking_talent=False, **fields)
+            db.session.add(venue)
+            db.session.commit()
+            venue_id = venue.id
+            db.session.remove()
+        return venue_id
+    return add
+
+
+@pytest.fixture
+def add_artist(app):
+    from models import db, Artist
+
+    def add(name, genres, city='San Francisco', state='CA', **fields):
+        with app.app_context():
+            artist = Artist(name=name, genres=genres, city=city, state=state,
+                            seeking_venue=False, **fields)
+            db.session.add(artist)
+            db.session.commit()
+            artist_id = artist.id
+            db.session.remove()
+        return artist_id
+    return add
@@ -0,0 +1,68 @@
+# Edits only write the fields that changed, in one UPDATE guarded by the
+# version the form was rendered with.
+import html
+import json
+import re
+from models import db, Venue, Artist
+
+
+def edit_form(client, path):
+    # the form as the browser would submit it, untouched
+    page = client.get(path).get_data(as_text=True)
+    version = re.search(r'name="version" value="([^"]*)"', page).group(1)
+    original = json.loads(html.unescape(
+        re.search(r'name="original" value="([^"]*)"', page).group(1)))
+    data = {"version": version, "original": json.dumps(original)}
+    for field, value in original.items():
+        if isinstance(value, bool):
+            if value:
+                data[field] = 'y'
+        else:
+            data[field] = '' if value is None else value
+    return data
+
+
+def stored(app, model, entity_id):
+    with app.app_context():
+        row = db.session.query(model.name, model.genres, model.version).filter(
+            model.id == entity_id).one()
+        db.session.remove()
+    return row
+
+
+def test_unchanged_submit_does_not_write(app, client, add_venue):
+    venue_id = add_venue('The Musical Hop', ['Jazz'])
+    data = edit_form(client, f'/venues/{venue_id}/edit')
+
+    response = client.post(f'/venues/{venue_id}/edit', data=data, follow_redirects=True)
+    assert 'was not changed' in response.get_data(as_text=True)
+    assert stored(app, Venue, venue_id).version == 1
+
+
+def test_genres_only_change_is_saved(app, client, add_artist):
+    artist_id = add_artist('Guns N Petals', ['Rock n Roll'])
+    data = edit_form(client, f'/artists/{artist_id}/edit')
+    data['genres'] = ['Rock n Roll', 'Punk']
+
+    response = client.post(f'/artists/{artist_id}/edit', data=data, follow_redirects=True)
+    assert 'successfully updated' in response.get_data(as_text=True)
+    artist = stored(app, Artist, artist_id)
+    assert artist.genres == ['Rock n Roll', 'Punk']
+    assert artist.version == 2
+
+
+def test_concurrent_edit_is_rejected(app, client, add_venue):
+    venue_id = add_venue('The Musical Hop', ['Jazz'])
+    first = edit_form(client, f'/venues/{venue_id}/edit')
+    second = edit_form(client, f'/venues/{venue_id}/edit')
+
+    first['name'] = 'The Musical Hop Bar'
+    client.post(f'/venues/{venue_id}/edit', data=first)
+    second['genres'] = ['Jazz', 'Swing']
+    response = client.post(f'/venues/{venue_id}/edit', data=second, follow_redirects=True)
+
+    assert 'changed by someone else' in response.get_data(as_text=True)
+    venue = stored(app, Venue, venue_id)
+    assert venue.name == 'The Musical Hop Bar'
+    assert venue.genres == ['Jazz']
+    assert venue.version == 2
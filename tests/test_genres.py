@@ -0,0 +1,55 @@
+# Genre filters on the venue and artist listings ('any' overlaps the
+# selected genres, 'all' contains them) and the facet counts beside them.
+
+
+def page(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_venues_filtered_by_one_genre(client, add_venue):
+    add_venue('The Musical Hop', ['Jazz', 'Reggae'])
+    add_venue('Park Square Live', ['Rock n Roll'])
+
+    listing = page(client, '/venues?genre=Jazz')
+    assert 'The Musical Hop' in listing
+    assert 'Park Square Live' not in listing
+    assert 'Reggae (1)' in listing
+
+
+def test_artists_match_any_genre(client, add_artist):
+    add_artist('The Wild Sax Band', ['Jazz', 'Classical'])
+    add_artist('Guns N Petals', ['Rock n Roll'])
+    add_artist('Matt Quevedo', ['Jazz'])
+    add_artist('Pianos Only', ['Classical'])
+
+    listing = page(client, '/artists?genre=Jazz&genre=Classical')
+    for name in ('The Wild Sax Band', 'Matt Quevedo', 'Pianos Only'):
+        assert name in listing
+    assert 'Guns N Petals' not in listing
+    assert 'Jazz (2)' in listing
+    assert 'Classical (2)' in listing
+
+
+def test_artists_match_all_genres(client, add_artist):
+    add_artist('The Wild Sax Band', ['Jazz', 'Classical'])
+    add_artist('Matt Quevedo', ['Jazz'])
+    add_artist('Pianos Only', ['Classical'])
+
+    listing = page(client, '/artists?genre=Jazz&genre=Classical&match=all')
+    assert 'The Wild Sax Band' in listing
+    assert 'Matt Quevedo' not in listing
+    assert 'Pianos Only' not in listing
+    assert 'Jazz (1)' in listing
+
+
+def test_search_within_a_genre(client, add_venue):
+    add_venue('Blue Note', ['Jazz'])
+    add_venue('Blue Moon', ['Folk'])
+
+    response = client.post('/venues/search', data={"search_term": "blue", "genre": "Jazz"})
+    assert response.status_code == 200
+    results = response.get_data(as_text=True)
+    assert 'Blue Note' in results
+    assert 'Blue Moon' not in results
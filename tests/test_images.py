@@ -0,0 +1,119 @@
+# The http image fetcher must not reach internal addresses, follow endless
+# redirects or read unbounded responses, failed originals are not fetched
+# over and over, and uploads have a total bound. These run without a database.
+import io
+import threading
+import time
+import urllib.error
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+import images
+
+CONFIG = {'IMAGE_MAX_BYTES': 100, 'IMAGE_FETCH_TIMEOUT': 5,
+          'IMAGE_FETCH_MAX_REDIRECTS': 2, 'IMAGE_FETCH_HOSTS': []}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith('/redirect/'):
+            hops = int(self.path.rsplit('/', 1)[1])
+            self.send_response(302)
+            self.send_header('Location', f'/redirect/{hops - 1}' if hops else '/image')
+            self.end_headers()
+            return
+        body = b'x' * (500 if self.path == '/large' else 50)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+
+
+@pytest.fixture
+def public_loopback(monkeypatch):
+    # lets the tests talk to the local server as if it were a public host
+    monkeypatch.setattr(images, 'check_peer', lambda sock: None)
+
+
+def test_refuses_internal_addresses(server):
+    with pytest.raises(ValueError, match='refusing'):
+        images.http_fetcher(CONFIG)(server + '/image')
+
+
+def test_refuses_other_schemes_and_hosts():
+    fetch = images.http_fetcher(dict(CONFIG, IMAGE_FETCH_HOSTS=['example.com']))
+    with pytest.raises(ValueError):
+        fetch('file:///etc/passwd')
+    with pytest.raises(ValueError, match='not fetched'):
+        fetch('http://example.org/image.jpg')
+    images.check_image_url('https://img.example.com/a.jpg', ['example.com'])
+
+
+def test_follows_a_few_redirects(server, public_loopback):
+    fetch = images.http_fetcher(CONFIG)
+    assert fetch(server + '/redirect/1') == b'x' * 50
+    with pytest.raises(urllib.error.HTTPError):
+        fetch(server + '/redirect/5')
+
+
+def test_refuses_large_images(server, public_loopback):
+    with pytest.raises(ValueError, match='larger'):
+        images.http_fetcher(CONFIG)(server + '/large')
+
+
+@pytest.fixture
+def app_images(tmp_path):
+    from app import create_app
+    app = create_app(overrides={"TESTING": True,
+                                "IMAGE_CACHE_DIR": str(tmp_path / 'thumbnails'),
+                                "IMAGE_UPLOAD_DIR": str(tmp_path / 'uploads'),
+                                "IMAGE_UPLOAD_MAX_BYTES": 2048})
+    return app, app.extensions['images']
+
+
+def wait_until_idle(service):
+    for _ in range(100):
+        if not service.pending:
+            return
+        time.sleep(0.01)
+
+
+def test_failed_originals_are_not_fetched_again(app_images):
+    app, service = app_images
+    calls = []
+
+    def fail(src):
+        calls.append(src)
+        raise ValueError('not found')
+    service.fetcher = fail
+    with app.test_request_context():
+        for _ in range(3):
+            service.schedule('https://example.com/missing.jpg', 'tile')
+            wait_until_idle(service)
+    assert len(calls) == 1
+
+
+def test_uploads_are_bounded(app_images):
+    Image = pytest.importorskip('PIL.Image')
+    app, service = app_images
+
+    def png(color):
+        output = io.BytesIO()
+        Image.new('RGB', (8, 8), color).save(output, 'PNG')
+        return io.BytesIO(output.getvalue())
+
+    stored = []
+    with pytest.raises(ValueError, match='full'):
+        for color in range(256):
+            stored.append(service.store_upload(png((color, 0, 0))))
+    assert stored
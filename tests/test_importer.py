@@ -0,0 +1,58 @@
+# flask import: bad records go to the rejects file, one at a time, and the
+# rest of the file is still imported.
+import io
+import json
+from importer import import_file
+from models import db, Show
+
+VENUE = {"city": "San Francisco", "state": "CA", "genres": ["Jazz"]}
+
+
+def run_import(app, kind, text, format):
+    rejects = io.StringIO()
+    with app.app_context():
+        stats = import_file(kind, io.StringIO(text), format, rejects)
+        db.session.remove()
+    return stats, [json.loads(line) for line in rejects.getvalue().splitlines()]
+
+
+def test_malformed_json_lines_are_rejected(app, reset_database):
+    reset_database()
+    lines = [json.dumps(dict(VENUE, name='The Musical Hop')),
+             '{"name": "Broken',
+             '["not", "an", "object"]',
+             json.dumps(dict(VENUE, name='Park Square Live'))]
+    stats, rejects = run_import(app, 'venues', '\n'.join(lines), 'jsonl')
+
+    assert stats == {"imported": 2, "rejected": 2}
+    assert [reject['record'] for reject in rejects] == lines[1:3]
+
+
+def test_overlapping_shows_are_written_to_rejects(app, reset_database, add_venue,
+                                                  add_artist):
+    reset_database()
+    venue_id = add_venue('The Musical Hop', ['Jazz'])
+    artist_id = add_artist('Guns N Petals', ['Rock n Roll'])
+    rows = ['start_time,venue_id,artist_id',
+            f'2030-01-01 20:00,{venue_id},{artist_id}',
+            # inside the first show's default two hours
+            f'2030-01-01 21:00,{venue_id},{artist_id}',
+            f'2030-01-02 20:00,{venue_id},{artist_id}']
+    stats, rejects = run_import(app, 'shows', '\n'.join(rows), 'csv')
+
+    assert stats == {"imported": 2, "rejected": 1}
+    assert len(rejects) == 1
+    assert rejects[0]['record']['start_time'].startswith('2030-01-01 21:00')
+    with app.app_context():
+        assert db.session.query(Show).count() == 2
+
+
+def test_values_longer_than_their_column_are_rejected(app, reset_database):
+    reset_database()
+    lines = [json.dumps(dict(VENUE, name='The Musical Hop')),
+             json.dumps(dict(VENUE, name='Long City', city='x' * 121)),
+             json.dumps(dict(VENUE, name='Park Square Live'))]
+    stats, rejects = run_import(app, 'venues', '\n'.join(lines), 'jsonl')
+
+    assert stats == {"imported": 2, "rejected": 1}
+    assert 'city' in rejects[0]['error']
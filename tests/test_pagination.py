@@ -0,0 +1,25 @@
+# Cursors come from the query string; one that does not fit the sort key is
+# ignored instead of reaching the database.
+import pytest
+from pagination import encode_cursor, decode_cursor
+from models import Show
+
+SORT_KEY = (Show.start_time, Show.id)
+
+
+@pytest.mark.parametrize('values', [['x'], ['2030-01-01T20:00:00', 'x'],
+                                    ['2030-01-01T20:00:00', True],
+                                    ['2030-01-01T20:00:00', 2 ** 40],
+                                    [1, 1], {"id": 1}])
+def test_mistyped_cursors_are_ignored(values):
+    assert decode_cursor(encode_cursor(values), SORT_KEY) is None
+
+
+def test_cursors_round_trip():
+    cursor = encode_cursor(['2030-01-01T20:00:00', 7])
+    assert decode_cursor(cursor, SORT_KEY)[1] == 7
+
+
+@pytest.mark.parametrize('path', ['/artists', '/venues', '/shows'])
+def test_tampered_cursor_gives_the_first_page(client, path):
+    assert client.get(path, query_string={"after": encode_cursor(['x'])}).status_code == 200
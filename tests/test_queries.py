@@ -0,0 +1,29 @@
+# Listing and detail pages must run the same number of statements however
+# many venues, artists and shows there are, i.e. no query per row.
+from sqlalchemy import func
+from models import db, Show
+from seed import seed_database
+
+PAGES = ['/venues', '/artists', '/shows', '/venues/{venue_id}', '/artists/{artist_id}']
+
+
+def busiest(column):
+    # the venue/artist with the most shows, so detail pages have rows to list
+    return db.session.query(column).group_by(column).order_by(
+        func.count().desc(), column).limit(1).scalar()
+
+
+def statements_per_page(app, client, count_statements, venues, artists, shows):
+    with app.app_context():
+        seed_database(venues=venues, artists=artists, shows=shows, seed=shows)
+        ids = {"venue_id": busiest(Show.venue_id), "artist_id": busiest(Show.artist_id)}
+        db.session.remove()
+    return {page: count_statements(client, page.format(**ids)) for page in PAGES}
+
+
+def test_statements_per_page_do_not_grow_with_the_data(app, client, reset_database,
+                                                       count_statements):
+    small = statements_per_page(app, client, count_statements, venues=3, artists=5, shows=10)
+    reset_database()
+    large = statements_per_page(app, client, count_statements, venues=40, artists=80, shows=800)
+    assert large == small
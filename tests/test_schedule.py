@@ -0,0 +1,35 @@
+# UpcomingShow holds exactly the shows that have not started yet, however
+# they were added.
+from datetime import datetime
+from models import db, Show, UpcomingShow
+from seed import seed_database
+
+
+def upcoming_shows(app):
+    with app.app_context():
+        scheduled = {id for (id,) in db.session.query(UpcomingShow.show_id)}
+        future = {id for (id,) in db.session.query(Show.id).filter(
+            Show.start_time > datetime.now())}
+        db.session.remove()
+    return scheduled, future
+
+
+def test_seeded_shows_are_scheduled(app, reset_database):
+    reset_database()
+    with app.app_context():
+        seed_database(venues=3, artists=5, shows=50, seed=1)
+        db.session.remove()
+    scheduled, future = upcoming_shows(app)
+    assert future
+    assert scheduled == future
+
+
+def test_created_show_is_scheduled(app, client, add_venue, add_artist):
+    venue_id = add_venue('The Musical Hop', ['Jazz'])
+    artist_id = add_artist('Guns N Petals', ['Rock n Roll'])
+    client.post('/shows/create', data={"venue_id": venue_id, "artist_id": artist_id,
+                                       "start_time": '2030-01-01 20:00:00'})
+    scheduled, future = upcoming_shows(app)
+    assert len(future) == 1
+    assert scheduled == future
+    assert 'Guns N Petals' in client.get(f'/venues/{venue_id}').get_data(as_text=True)
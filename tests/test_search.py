@@ -0,0 +1,41 @@
+# Search matches names, "city, state" and genres; a term that is part of a
+# genre name finds everything tagged with that genre.
+
+
+def search_results(client, kind, search_term):
+    response = client.post(f'/{kind}/search', data={"search_term": search_term})
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_venue_search_by_genre_substring(client, add_venue):
+    add_venue('The Musical Hop', ['Jazz', 'Reggae'])
+    add_venue('Park Square Live', ['Rock n Roll'])
+    add_venue('The Dueling Pianos Bar', ['Classical'])
+
+    page = search_results(client, 'venues', 'rock')
+    assert 'Park Square Live' in page
+    assert 'The Musical Hop' not in page
+
+    page = search_results(client, 'venues', 'a')
+    assert 'The Musical Hop' in page
+    assert 'The Dueling Pianos Bar' in page
+
+
+def test_artist_search_by_genre_substring(client, add_artist):
+    add_artist('Guns N Petals', ['Rock n Roll'])
+    add_artist('The Wild Sax Band', ['Jazz', 'Classical'])
+
+    page = search_results(client, 'artists', 'roll')
+    assert 'Guns N Petals' in page
+    assert 'The Wild Sax Band' not in page
+
+
+def test_search_by_name_and_city_state(client, add_venue):
+    add_venue('Blue Note', ['Jazz'], city='New York', state='NY')
+    add_venue('Red Room', ['Folk'], city='Austin', state='TX')
+
+    assert 'Blue Note' in search_results(client, 'venues', 'blue')
+    page = search_results(client, 'venues', 'Austin, TX')
+    assert 'Red Room' in page
+    assert 'Blue Note' not in page
@@ -0,0 +1,16 @@
+# The booking form rejects shows that would end before they start.
+from models import db, Show
+
+
+def test_duration_under_a_minute_is_rejected(app, client, add_venue, add_artist):
+    venue_id = add_venue('The Musical Hop', ['Jazz'])
+    artist_id = add_artist('Guns N Petals', ['Rock n Roll'])
+    for duration in ('0', '-30'):
+        response = client.post('/shows/create', data={
+            "venue_id": venue_id, "artist_id": artist_id,
+            "start_time": '2030-01-01 20:00:00', "duration": duration})
+        assert response.status_code == 200
+        assert 'could not be listed' in response.get_data(as_text=True)
+    with app.app_context():
+        assert db.session.query(Show).count() == 0
+        db.session.remove()
@@ -0,0 +1,310 @@
+# ----------------------------------------------------------------------------#
+# Venues.
+# Listing, search, detail, create, edit and delete pages for venues, their
+# JSON API and availability. WTForms is imported in the views that render
+# or read a form, so it is only loaded once one is needed.
+# ----------------------------------------------------------------------------#
+import json
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, render_template, request, flash, redirect, url_for, abort
+from sqlalchemy import func
+from models import db, Venue, Artist, Show, UpcomingShow
+from schedule import update_scheduled_venue, upcoming_venue_shows_query
+from exporter import parse_date
+from search import search, filter_genres
+from pagination import keyset_page
+from helpers import (page_cache, facet_cache, map_boolean, default_pic, page_cursors,
+                     selected_genres, genre_match, genre_sidebar, page_cacheable, page_expiry,
+                     venues_page_keys, venue_page_keys, partition_shows, by_start_time,
+                     venue_show_info, delete_entities, bulk_delete, edit_form_data,
+                     submitted_values, changed_values, update_if_unchanged, api_response,
+                     api_entities)
+
+bp = Blueprint('venues', __name__)
+
+
+VENUES_SORT_KEY = (Venue.state, Venue.city, Venue.id)
+
+
+def venues_by_area_query():
+    # only the columns the listing uses; paginated in VENUES_SORT_KEY order,
+    # which keeps every city/state pair contiguous
+    return filter_genres(db.session.query(Venue.id, Venue.name, Venue.city, Venue.state),
+                         Venue, selected_genres(), genre_match())
+
+
+def group_venues_by_area(rows):
+    # single pass over rows ordered by state/city
+    areas = []
+    current = None
+    for row in rows:
+        if current is None or current['city'] != row.city or current['state'] != row.state:
+            current = {"city": row.city, "state": row.state, "venues": []}
+            areas.append(current)
+        current['venues'].append({"id": row.id, "name": row.name})
+    return areas
+
+
+@ bp.route('/venues')
+def venues():
+    page = keyset_page(venues_by_area_query(), VENUES_SORT_KEY,
+                       current_app.config['PAGE_SIZE'], **page_cursors())
+    areas = group_venues_by_area(page['rows'])
+    return render_template('pages/venues.html', areas=areas, page=page,
+                           genres=genre_sidebar(Venue))
+
+
+@ bp.route('/venues/search', methods=['POST'])
+def search_venues():
+    search_term = request.form.get('search_term', '')
+    venues_search = search(Venue, search_term, current_app.config['SEARCH_RESULTS_LIMIT'],
+                           selected_genres(), genre_match())
+
+    response = {
+        "count": len(venues_search),
+        "data": venues_search
+    }
+    return render_template('pages/search_venues.html', results=response, search_term=request.form.get('search_term', ''))
+
+
+def venue_shows_query():
+    # shows joined to their artist, as listed on a venue page
+    return db.session.query(
+        Show.venue_id,
+        Show.start_time,
+        Artist.id.label('artist_id'),
+        Artist.name.label('artist_name'),
+        Artist.image_link.label('artist_image_link')
+    ).join(Artist, Show.artist_id == Artist.id).order_by(Show.start_time)
+
+
+def venue_shows_union(venue_id, now):
+    # past shows from Show, upcoming ones from the schedule, in one round trip
+    past = venue_shows_query().filter(
+        Show.venue_id == venue_id, Show.start_time <= now)
+    upcoming = upcoming_venue_shows_query().filter(
+        UpcomingShow.venue_id == venue_id, UpcomingShow.start_time > now)
+    return past.order_by(None).union_all(upcoming.order_by(None))
+
+
+def shows_in_venue(rows, now):
+    return partition_shows(sorted(rows, key=by_start_time), venue_show_info, now)
+
+
+def complete_venue_data(venue):
+    return Venue(
+        id=venue.id,
+        name=venue.name,
+        city=venue.city,
+        state=venue.state,
+        address=venue.address,
+        phone=venue.phone,
+        image_link=venue.image_link,
+        facebook_link=venue.facebook_link,
+        website_link=venue.website_link,
+        seeking_talent=venue.seeking_talent or False,
+        seeking_description=venue.seeking_description,
+        genres=venue.genres or []
+    )
+
+
+@ bp.route('/venues/<int:venue_id>')
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    cacheable = page_cacheable()
+    if cacheable:
+        page = page_cache.get(('venue', venue_id))
+        if page is not None:
+            return page
+
+    now = datetime.now()
+    venue_row = db.session.query(*Venue.__table__.columns).filter(Venue.id == venue_id).first()
+    if venue_row is None:
+        abort(404)
+    venue = complete_venue_data(venue_row)
+    shows_list = shows_in_venue(venue_shows_union(venue_id, now).all(), now)
+    venue_form = {"id": venue.id,
+                  "name": venue.name,
+                  "city": venue.city,
+                  "state": venue.state,
+                  "address": venue.address,
+                  "phone": venue.phone,
+                  "image_link": venue.image_link,
+                  "facebook_link": venue.facebook_link,
+                  "website_link": venue.website_link,
+                  "seeking_talent": venue.seeking_talent or False,
+                  "seeking_description": venue.seeking_description,
+                  "upcoming_shows": shows_list['upcoming_shows'] or [],
+                  "past_shows": shows_list['past_shows'] or [],
+                  "upcoming_shows_count":  shows_list['upcoming_shows_count'],
+                  "past_shows_count": shows_list['past_shows_count']}
+
+    page = render_template('pages/show_venue.html', venue=venue_form)
+    if cacheable:
+        page_cache.set(('venue', venue_id), page,
+                       page_expiry(shows_list['next_show_time']))
+    return page
+
+
+#  Create Venue
+#  ----------------------------------------------------------------
+@ bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+    from forms import VenueForm
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+
+@ bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    # TODO: insert form data as a new Venue record in the db, ins
+    message = ''
+    # Instanciate the form to use form.name.data way.
+    from forms import VenueForm
+    form = VenueForm(request.form, meta={'csrf': False})
+    try:
+        venue = Venue(name=form.name.data,
+                      city=form.city.data,
+                      state=form.state.data,
+                      address=form.address.data,
+                      phone=form.phone.data,
+                      genres=form.genres.data,
+                      image_link=default_pic(
+                          True, form.image_link.data),
+                      facebook_link=form.facebook_link.data,
+                      website_link=form.website_link.data,
+                      seeking_talent=map_boolean(
+                          form.seeking_talent.data),
+                      seeking_description=form.seeking_description.data)
+        db.session.add(venue)
+        db.session.commit()
+        facet_cache.clear()
+        message = f'Venue {form.name.data} was successfully listed!'
+    except Exception as e:
+        db.session.rollback()
+        message = f'An error occurred. Venue {form.name.data} could not be listed.'
+    finally:
+        db.session.close()
+
+    flash(message)
+    return render_template('pages/home.html')
+
+
+#  Delete Venue
+#  ----------------------------------------------------------------
+@ bp.route('/venues/<int:venue_id>/delete', methods=['POST'])
+def delete_venue(venue_id):
+    message = ''
+    try:
+        deleted = delete_entities(Venue, [venue_id], venues_page_keys)
+        if deleted:
+            message = f'Venue {deleted[0].name} has been deleted.'
+        else:
+            message = f'Venue {venue_id} does not exist.'
+    except Exception as e:
+        db.session.rollback()
+        message = f'An error occurred. Venue {venue_id} could not be deleted.'
+    finally:
+        db.session.close()
+
+    flash(message)
+    return render_template('pages/home.html')
+
+
+@ bp.route('/venues/delete', methods=['POST'])
+def delete_venues():
+    return bulk_delete(Venue, venues_page_keys)
+
+
+#  Update Venue
+#  ----------------------------------------------------------------
+VENUE_EDIT_FIELDS = ['name', 'genres', 'address', 'city', 'state', 'phone', 'website_link',
+                     'facebook_link', 'seeking_talent', 'seeking_description', 'image_link']
+
+
+@ bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    venue = edit_form_data(Venue, venue_id, VENUE_EDIT_FIELDS)
+    from forms import VenueForm
+    form = VenueForm(data=venue, meta={'csrf': False})
+    original = json.dumps({field: venue[field] for field in VENUE_EDIT_FIELDS})
+    return render_template('forms/edit_venue.html', form=form, venue=venue, original=original)
+
+
+@ bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    message = ''
+    from forms import VenueForm
+    form = VenueForm(request.form, meta={'csrf': False})
+    submitted = submitted_values(form, VENUE_EDIT_FIELDS, True)
+    changes = changed_values(submitted, True)
+    try:
+        if not changes:
+            message = f'Venue {form.name.data} was not changed.'
+        elif not update_if_unchanged(Venue, venue_id, changes):
+            db.session.rollback()
+            message = f'Venue {venue_id} was changed by someone else in the meantime. Please review it and edit again.'
+        else:
+            stale_pages = [('venue', venue_id)]
+            if 'name' in changes or 'image_link' in changes:
+                update_scheduled_venue(venue_id, submitted['name'], submitted['image_link'])
+                stale_pages = venue_page_keys(venue_id)
+            db.session.commit()
+            page_cache.invalidate(*stale_pages)
+            if 'genres' in changes:
+                facet_cache.clear()
+            message = f'Venue {form.name.data} was successfully updated!'
+    except Exception as e:
+        db.session.rollback()
+        message = f'An error occurred. Venue {venue_id} could not be updated.'
+    finally:
+        db.session.close()
+
+    flash(message)
+
+    return redirect(url_for('venues.show_venue', venue_id=venue_id))
+
+
+#  API
+#  ----------------------------------------------------------------
+@ bp.route('/api/venues')
+def api_venues():
+    return api_entities(Venue, upcoming_venue_shows_query(), UpcomingShow.venue_id,
+                        venue_show_info)
+
+
+#  Availability
+#  ----------------------------------------------------------------
+def free_slots(bookings, start, end):
+    # gaps between the (start_time, end_time) bookings, which come ordered
+    slots = []
+    cursor = start
+    for booked_start, booked_end in bookings:
+        if booked_start > cursor:
+            slots.append({"start": cursor, "end": booked_start})
+        cursor = max(cursor, booked_end or end)
+    if cursor < end:
+        slots.append({"start": cursor, "end": end})
+    return slots
+
+
+@ bp.route('/venues/<int:venue_id>/availability')
+def venue_availability(venue_id):
+    try:
+        start = parse_date(request.args.get('from')) or datetime.now()
+        end = parse_date(request.args.get('to')) or start + timedelta(days=30)
+    except (ValueError, OverflowError):
+        return api_response({"error": "from and to must be dates"}, 400)
+    if end <= start:
+        return api_response({"error": "to must be after from"}, 400)
+
+    # the same (venue_id, tsrange) GiST index that rejects double bookings
+    bookings = db.session.query(Show.start_time, Show.end_time).filter(
+        Show.venue_id == venue_id,
+        Show.start_time.isnot(None),
+        func.tsrange(Show.start_time, Show.end_time).op('&&')(func.tsrange(start, end))
+    ).order_by(Show.start_time).all()
+    return api_response({"venue_id": venue_id,
+                         "from": start,
+                         "to": end,
+                         "free": free_slots(bookings, start, end)})